@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional, List
 
-@dataclass
+@dataclass(slots=True)
 class AccountDetail:
     """Detalhes de conta do Instagram mapeados do Apify"""
     name: Optional[str]
@@ -14,21 +14,21 @@ class AccountDetail:
     biography: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class MusicInfo:
     """Informações de música de um post do Instagram"""
     artistName: Optional[str]
     songName: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class Dimensions:
     """Dimensões de um post do Instagram"""
     height: Optional[int]
     width: Optional[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class VideoInfo:
     """Informações de vídeo de um post do Instagram"""
     url: Optional[str]
@@ -37,7 +37,7 @@ class VideoInfo:
     duration: Optional[float]
 
 
-@dataclass
+@dataclass(slots=True)
 class CommentDetail:
     """Detalhes de um comentário do Instagram"""
     text: Optional[str]
@@ -48,7 +48,7 @@ class CommentDetail:
     timestamp: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class PostCommentsMap:
     """Mapeamento de post com comentários do Instagram"""
     shortCode: Optional[str]
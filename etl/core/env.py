@@ -9,6 +9,45 @@ class CoreEnv:
   gcp_project_id: str
   ollama_base_url: str
   ollama_model: str
+  apify_api_url: str
+  apify_run_mode: str
+  apify_poll_interval_seconds: float
+  apify_max_in_flight_runs: int
+  apify_min_concurrent_runs: int
+  apify_initial_concurrent_runs: int
+  apify_max_concurrent_runs: int
+  apify_max_retries: int
+  apify_cache_path: str
+  apify_cache_ttl_seconds: float
+  apify_cache_max_bytes: int
+  apify_cache_max_entry_bytes: int
+  apify_run_deadline_seconds: float
+  apify_hedge_budget_ratio: float
+  apify_hedge_percentile: float
+  processor_jobs_dir: str
+  processor_job_queue_size: int
+  processor_job_workers: int
+  processor_dispatch_mode: str
+  scraper_worker_consumers: int
+  kafka_consumer_max_attempts: int
+  kafka_consumer_retry_backoff_seconds: float
+  gcs_max_concurrent_uploads: int
+  batch_file_format: str
+  batch_file_max_bytes: int
+  batch_file_max_accounts: int
+  json_codec: str
+  processor_mapping_workers: int
+  account_watermarks_path: str
+  account_freshness_seconds: float
+  bigquery_insert_max_rows: int
+  bigquery_insert_max_bytes: int
+  bigquery_sink_mode: str
+  bigquery_table_sink_modes: str
+  bigquery_staging_bucket: str
+  bigquery_staging_prefix: str
+  dim_date_calendar_start: str
+  dim_date_calendar_end: str
+  bigquery_dedup_cache_size: int
 
   def __init__(self):
     self.bucket_instagram = os.getenv("BUCKET_INSTAGRAM")
@@ -18,4 +57,45 @@ class CoreEnv:
     self.kafka_cluster_host = os.getenv("KAFKA_CLUSTER_HOST")
     self.gcp_project_id = os.getenv("GCP_PROJECT_ID")
     self.ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1")
\ No newline at end of file
+    self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1")
+    self.apify_api_url = os.getenv("APIFY_API_URL")
+    self.apify_run_mode = os.getenv("APIFY_RUN_MODE", "call")
+    self.apify_poll_interval_seconds = float(os.getenv("APIFY_POLL_INTERVAL_SECONDS", "5"))
+    # Execuções simultâneas permitidas pelo plano da conta do Apify (modo poll).
+    self.apify_max_in_flight_runs = int(os.getenv("APIFY_MAX_IN_FLIGHT_RUNS", "100"))
+    self.apify_min_concurrent_runs = int(os.getenv("APIFY_MIN_CONCURRENT_RUNS", "1"))
+    self.apify_initial_concurrent_runs = int(os.getenv("APIFY_INITIAL_CONCURRENT_RUNS", "10"))
+    self.apify_max_concurrent_runs = int(os.getenv("APIFY_MAX_CONCURRENT_RUNS", "32"))
+    self.apify_max_retries = int(os.getenv("APIFY_MAX_RETRIES", "3"))
+    self.apify_cache_path = os.getenv("APIFY_CACHE_PATH", ".cache/apify_results.sqlite3")
+    self.apify_cache_ttl_seconds = float(os.getenv("APIFY_CACHE_TTL_SECONDS", "3600"))
+    self.apify_cache_max_bytes = int(os.getenv("APIFY_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    self.apify_cache_max_entry_bytes = int(os.getenv("APIFY_CACHE_MAX_ENTRY_BYTES", str(16 * 1024 * 1024)))
+    self.apify_run_deadline_seconds = float(os.getenv("APIFY_RUN_DEADLINE_SECONDS", "1800"))
+    self.apify_hedge_budget_ratio = float(os.getenv("APIFY_HEDGE_BUDGET_RATIO", "0"))
+    self.apify_hedge_percentile = float(os.getenv("APIFY_HEDGE_PERCENTILE", "0.95"))
+    self.processor_jobs_dir = os.getenv("PROCESSOR_JOBS_DIR", ".jobs")
+    self.processor_job_queue_size = int(os.getenv("PROCESSOR_JOB_QUEUE_SIZE", "10"))
+    self.processor_job_workers = int(os.getenv("PROCESSOR_JOB_WORKERS", "1"))
+    self.processor_dispatch_mode = os.getenv("PROCESSOR_DISPATCH_MODE", "local")
+    self.scraper_worker_consumers = int(os.getenv("SCRAPER_WORKER_CONSUMERS", "4"))
+    self.kafka_consumer_max_attempts = int(os.getenv("KAFKA_CONSUMER_MAX_ATTEMPTS", "5"))
+    self.kafka_consumer_retry_backoff_seconds = float(os.getenv("KAFKA_CONSUMER_RETRY_BACKOFF_SECONDS", "1"))
+    self.gcs_max_concurrent_uploads = int(os.getenv("GCS_MAX_CONCURRENT_UPLOADS", "4"))
+    self.batch_file_format = os.getenv("BATCH_FILE_FORMAT", "ndjson.gz")
+    self.batch_file_max_bytes = int(os.getenv("BATCH_FILE_MAX_BYTES", str(64 * 1024 * 1024)))
+    self.batch_file_max_accounts = int(os.getenv("BATCH_FILE_MAX_ACCOUNTS", "10"))
+    self.json_codec = os.getenv("JSON_CODEC", "auto")
+    self.processor_mapping_workers = int(os.getenv("PROCESSOR_MAPPING_WORKERS", "0"))
+    self.account_watermarks_path = os.getenv("ACCOUNT_WATERMARKS_PATH", ".cache/account_watermarks.sqlite3")
+    self.account_freshness_seconds = float(os.getenv("ACCOUNT_FRESHNESS_SECONDS", "3600"))
+    self.bigquery_insert_max_rows = int(os.getenv("BIGQUERY_INSERT_MAX_ROWS", "500"))
+    self.bigquery_insert_max_bytes = int(os.getenv("BIGQUERY_INSERT_MAX_BYTES", str(5 * 1024 * 1024)))
+    self.bigquery_sink_mode = os.getenv("BIGQUERY_SINK_MODE", "streaming")
+    self.bigquery_table_sink_modes = os.getenv("BIGQUERY_TABLE_SINK_MODES", "")
+    self.bigquery_staging_bucket = os.getenv("BIGQUERY_STAGING_BUCKET", self.bucket_instagram)
+    self.bigquery_staging_prefix = os.getenv("BIGQUERY_STAGING_PREFIX", "bigquery_staging")
+    # Intervalo já carregado em dim_date pela migração do calendário.
+    self.dim_date_calendar_start = os.getenv("DIM_DATE_CALENDAR_START", "2010-01-01")
+    self.dim_date_calendar_end = os.getenv("DIM_DATE_CALENDAR_END", "2035-12-31")
+    self.bigquery_dedup_cache_size = int(os.getenv("BIGQUERY_DEDUP_CACHE_SIZE", "500000"))
\ No newline at end of file
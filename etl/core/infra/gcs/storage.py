@@ -1,18 +1,30 @@
+import asyncio
+from typing import BinaryIO
 from google.cloud import storage
 from .types import UploadFile, UploadFileReturn
 from core.utils.file import generate_unique_filename
 
 from core.env import CoreEnv
 
+# Acima deste tamanho o envio é feito em partes (upload resumable), o que
+# permite retomar um bloco com falha sem reenviar o arquivo inteiro.
+RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+RESUMABLE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_CONCURRENT_UPLOADS = 4
+
 class StorageGCS:
-  def __init__(self):
+  def __init__(self, max_concurrent_uploads: int = DEFAULT_MAX_CONCURRENT_UPLOADS):
     self.client = storage.Client.from_service_account_json(CoreEnv().account_service_instagram_gcp)
+    self._uploads_semaphore = asyncio.Semaphore(max_concurrent_uploads)
 
   def upload_file(self, payload: UploadFile) -> UploadFileReturn:
     bucket = self.client.bucket(payload.bucket_name)
     file_name = generate_unique_filename(prefix=payload.file_name, ext=payload.extension)
     blob = bucket.blob(file_name)
 
+    if len(payload.buffer) > RESUMABLE_UPLOAD_THRESHOLD:
+      blob.chunk_size = RESUMABLE_UPLOAD_CHUNK_SIZE
+
     blob.upload_from_string(payload.buffer, content_type=payload.mime_type)
 
     print(
@@ -23,9 +35,24 @@ class StorageGCS:
       'saved_path': f'{payload.bucket_name}/{file_name}'
     }
 
+  async def upload_file_async(self, payload: UploadFile) -> UploadFileReturn:
+    """Envia o arquivo em uma thread, sem bloquear o event loop.
+
+    No máximo `max_concurrent_uploads` envios acontecem ao mesmo tempo.
+    """
+    loop = asyncio.get_event_loop()
+    async with self._uploads_semaphore:
+      return await loop.run_in_executor(None, self.upload_file, payload)
+
   def download_file(self, bucket_name: str, file_name: str) -> bytes:
     bucket = self.client.bucket(bucket_name)
     blob = bucket.blob(file_name)
     return blob.download_as_bytes()
 
-storage_gcs = StorageGCS()
\ No newline at end of file
+  def open_file(self, bucket_name: str, file_name: str) -> BinaryIO:
+    """Abre o arquivo para leitura em streaming, sem baixá-lo inteiro."""
+    bucket = self.client.bucket(bucket_name)
+    blob = bucket.blob(file_name)
+    return blob.open("rb")
+
+storage_gcs = StorageGCS(max_concurrent_uploads=CoreEnv().gcs_max_concurrent_uploads)
\ No newline at end of file
@@ -1,15 +1,21 @@
 from enum import Enum
-from typing import TypedDict, Dict
+from typing import TypedDict, Dict, Union
 
 class ValidExtension(Enum):
   JSON = 'json'
+  NDJSON_GZIP = 'ndjson.gz'
+  NDJSON_ZSTD = 'ndjson.zst'
+  PARQUET = 'parquet'
 
 mime_types_map: Dict[ValidExtension, str] = {
-  "json": "application/json"
+  "json": "application/json",
+  "ndjson.gz": "application/gzip",
+  "ndjson.zst": "application/zstd",
+  "parquet": "application/vnd.apache.parquet"
 }
 
 class UploadFile:
-  def __init__(self, bucket_name: str, file_name: str, extension: ValidExtension, buffer: str):
+  def __init__(self, bucket_name: str, file_name: str, extension: ValidExtension, buffer: Union[str, bytes]):
     self.bucket_name = bucket_name
     self.file_name = file_name
     self.extension = extension.value
@@ -0,0 +1,46 @@
+from typing import Any, Dict, List, Tuple
+
+# Colunas gravadas pelo ETL em cada tabela (infra/bigquery/schemas). Ficam de
+# fora as enrichment_*, preenchidas pelo enriching consumer, e as de SCD tipo 2.
+TABLE_COLUMNS = {
+  "dim_date": ("date_sk", "date", "day", "month", "year", "weekday", "is_weekend"),
+  "dim_instagram_account": ("account_sk", "name", "nickname", "url"),
+  "fact_instagram_account_snapshot": (
+    "account_sk", "followers_count", "follows_count", "isBusiness", "category", "biography"
+  ),
+  "dim_instagram_post": (
+    "post_sk", "account_sk", "date_sk", "external_code", "caption", "hash_tags", "audio_url",
+    "music_name", "owner_music_name", "video_url", "video_duration", "dim_height", "dim_width", "location"
+  ),
+  "fact_instagram_post_metrics": (
+    "account_sk", "post_sk", "comments_count", "likes_count", "video_view_count", "video_play_count", "date_sk"
+  ),
+  "dim_instagram_comment": ("comment_sk", "post_sk", "account_sk", "owner_username", "date_sk"),
+  "fact_instagram_comment_metrics": (
+    "account_sk", "post_sk", "comment_sk", "text", "owner_pic_url", "repliesCount", "linkesCount", "date_sk"
+  ),
+}
+
+# Campos das entidades cujo nome difere da coluna na tabela.
+COLUMN_RENAMES = {
+  "fact_instagram_account_snapshot": {"is_business": "isBusiness"},
+  "fact_instagram_comment_metrics": {"replies_count": "repliesCount", "likes_count": "linkesCount"},
+}
+
+def _column_fields(table_name: str) -> List[Tuple[str, str]]:
+  fields_by_column = {column: field for field, column in COLUMN_RENAMES.get(table_name, {}).items()}
+  return [(column, fields_by_column.get(column, column)) for column in TABLE_COLUMNS[table_name]]
+
+_TABLE_COLUMN_FIELDS = {table_name: _column_fields(table_name) for table_name in TABLE_COLUMNS}
+
+def to_table_row(table_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+  """Projeta uma entidade serializada nas colunas da tabela do BigQuery.
+
+  Campos que a tabela não tem (ex.: video_url em fact_instagram_post_metrics,
+  que fica em dim_instagram_post) são descartados, e os renomeados vão com o
+  nome da coluna. Tabelas fora de TABLE_COLUMNS passam sem alteração.
+  """
+  column_fields = _TABLE_COLUMN_FIELDS.get(table_name)
+  if column_fields is None:
+    return row
+  return {column: row.get(field) for column, field in column_fields}
@@ -0,0 +1,73 @@
+from datetime import date, datetime
+from typing import Iterable, Optional, Set, Tuple
+
+from core.entities.instagram import DimDate
+from core.env import CoreEnv
+
+DATE_SK_FORMAT = "%Y%m%d"
+# Posts sem timestamp apontam para esta chave, que não tem linha em dim_date.
+UNKNOWN_DATE_SK = "00000000"
+
+def date_sk_for(value: date) -> str:
+  """Chave determinística da data no formato YYYYMMDD."""
+  return value.strftime(DATE_SK_FORMAT)
+
+def build_date_dimension(value: datetime, date_sk: str) -> DimDate:
+  return DimDate(
+    date_sk=date_sk,
+    date=value.strftime("%Y-%m-%d"),
+    day=value.day,
+    month=value.month,
+    year=value.year,
+    weekday=value.strftime("%A"),
+    is_weekend=value.weekday() in [5, 6],
+  )
+
+class DateDimensionCache:
+  """Resolve o date_sk de uma data sem gravar uma linha de dim_date por registro.
+
+  As datas entre `calendar_start` e `calendar_end` já existem na tabela
+  (infra/bigquery/migrations/002_dim_date_calendar.sql). Fora desse intervalo,
+  a linha é gerada só na primeira vez que a data aparece no processo.
+
+  Uma linha gerada fica pendente até `commit`, chamado depois que ela foi
+  gravada; `discard` esquece as pendentes quando a gravação falha, para que
+  a reentrega gere as linhas de novo. Os dois aceitam só os date_sk de um
+  lote, para quando vários lotes estão pendentes ao mesmo tempo.
+  """
+
+  def __init__(self, calendar_start: date, calendar_end: date):
+    self.calendar_start = calendar_start
+    self.calendar_end = calendar_end
+    self._seen: Set[str] = set()
+    self._pending: Set[str] = set()
+
+  def resolve(self, value: datetime) -> Tuple[str, Optional[DimDate]]:
+    """Retorna o date_sk e a linha de dim_date a gravar, ou None se ela já existe."""
+    date_sk = date_sk_for(value)
+    if (
+      self.calendar_start <= value.date() <= self.calendar_end
+      or date_sk in self._seen
+      or date_sk in self._pending
+    ):
+      return date_sk, None
+
+    self._pending.add(date_sk)
+    return date_sk, build_date_dimension(value, date_sk)
+
+  def commit(self, date_sks: Optional[Iterable[str]] = None):
+    """Marca como gravadas as linhas pendentes (todas, ou só as de `date_sks`)."""
+    committed = self._pending if date_sks is None else self._pending.intersection(date_sks)
+    self._seen.update(committed)
+    self._pending.difference_update(committed)
+
+  def discard(self, date_sks: Optional[Iterable[str]] = None):
+    if date_sks is None:
+      self._pending.clear()
+    else:
+      self._pending.difference_update(date_sks)
+
+date_dimension_cache = DateDimensionCache(
+  calendar_start=date.fromisoformat(CoreEnv().dim_date_calendar_start),
+  calendar_end=date.fromisoformat(CoreEnv().dim_date_calendar_end)
+)
@@ -0,0 +1,235 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID, uuid5
+
+from core.entities.instagram import (
+  DimInstagramAccount, DimInstagramPost, DimInstagramComment, DimDate,
+  FactInstagramAccountSnapshot, FactInstagramPostMetrics, FactInstagramCommentMetrics
+)
+from core.entities.pre_file_instagram import PostCommentsMap, AccountDetail
+from core.mappers.date_dimension import (
+  UNKNOWN_DATE_SK, DateDimensionCache, date_dimension_cache
+)
+from core.utils.serialize import safe_get
+
+# Namespace fixo das chaves: a mesma chave natural gera sempre o mesmo sk.
+SURROGATE_KEY_NAMESPACE = UUID("6f1f6f5e-3b7a-4c1e-9a43-2f0d8c5b7e21")
+
+@dataclass
+class InstagramStarSchemaRows:
+  """Linhas de cada tabela do modelo estrela geradas a partir de um lote de contas."""
+  dim_instagram_account: List[DimInstagramAccount] = field(default_factory=list)
+  fact_instagram_account_snapshot: List[FactInstagramAccountSnapshot] = field(default_factory=list)
+  dim_instagram_post: List[DimInstagramPost] = field(default_factory=list)
+  fact_instagram_post_metrics: List[FactInstagramPostMetrics] = field(default_factory=list)
+  dim_instagram_comment: List[DimInstagramComment] = field(default_factory=list)
+  fact_instagram_comment_metrics: List[FactInstagramCommentMetrics] = field(default_factory=list)
+  dim_date: List[DimDate] = field(default_factory=list)
+
+  def tables(self):
+    """Itera (nome da tabela, linhas), na ordem em que as tabelas dependem umas das outras."""
+    return [
+      ("dim_date", self.dim_date),
+      ("dim_instagram_account", self.dim_instagram_account),
+      ("fact_instagram_account_snapshot", self.fact_instagram_account_snapshot),
+      ("dim_instagram_post", self.dim_instagram_post),
+      ("fact_instagram_post_metrics", self.fact_instagram_post_metrics),
+      ("dim_instagram_comment", self.dim_instagram_comment),
+      ("fact_instagram_comment_metrics", self.fact_instagram_comment_metrics),
+    ]
+
+def map_account_to_star_schema(
+  account: AccountDetail,
+  posts: List[PostCommentsMap],
+  rows: Optional[InstagramStarSchemaRows] = None,
+  dates: DateDimensionCache = date_dimension_cache
+) -> InstagramStarSchemaRows:
+  """Converte uma conta e seus posts nas linhas do modelo estrela.
+
+  Recebe os dados já serializados (dicts). Se `rows` for informado, as linhas
+  são acrescentadas a ele. dim_date só recebe datas que `dates` ainda não conhece.
+  """
+  rows = rows or InstagramStarSchemaRows()
+
+  def resolve_date_sk(value: datetime) -> str:
+    date_sk, date_row = dates.resolve(value)
+    if date_row:
+      rows.dim_date.append(date_row)
+    return date_sk
+  account_sk = account_sk_for(account)
+
+  rows.dim_instagram_account.append(build_account_dimension(account, account_sk))
+  if has_account_fact_data(account):
+    rows.fact_instagram_account_snapshot.append(build_account_fact(account, account_sk))
+
+  for post in posts or []:
+    post_sk = post_sk_for(post)
+    post_date = parse_timestamp_or_none(safe_get(post, "timestamp"))
+    post_date_sk = resolve_date_sk(post_date) if post_date else UNKNOWN_DATE_SK
+
+    rows.dim_instagram_post.append(build_post_dimension(post, account_sk, post_date_sk, post_sk))
+    if has_post_fact_data(post):
+      rows.fact_instagram_post_metrics.append(build_post_fact(post, account_sk, post_sk, post_date_sk))
+
+    for comment in safe_get(post, "latest_comments") or []:
+      comment_sk = comment_sk_for(post, comment)
+      comment_date_sk = post_date_sk
+      comment_date = parse_timestamp_or_none(safe_get(comment, "timestamp"))
+      if comment_date:
+        comment_date_sk = resolve_date_sk(comment_date)
+
+      rows.dim_instagram_comment.append(
+        build_comment_dimension(comment, post_sk, account_sk, comment_sk, comment_date_sk)
+      )
+      if has_comment_fact_data(comment):
+        rows.fact_instagram_comment_metrics.append(
+          build_comment_fact(comment, post_sk, account_sk, comment_sk, comment_date_sk)
+        )
+
+  return rows
+
+def surrogate_key(kind: str, *natural_key: Optional[str]) -> str:
+  """Chave substituta determinística (uuid5) a partir da chave natural."""
+  return str(uuid5(SURROGATE_KEY_NAMESPACE, "|".join([kind, *("" if part is None else str(part) for part in natural_key)])))
+
+def account_sk_for(account: AccountDetail) -> str:
+  return surrogate_key("account", (safe_get(account, "name") or "").lower())
+
+def post_sk_for(post: PostCommentsMap) -> str:
+  return surrogate_key("post", safe_get(post, "shortCode"))
+
+def comment_sk_for(post: PostCommentsMap, comment: dict) -> str:
+  """Comentários não têm id no arquivo: a chave é post + autor + horário (ou texto, sem horário)."""
+  timestamp = safe_get(comment, "timestamp")
+  return surrogate_key(
+    "comment",
+    safe_get(post, "shortCode"),
+    safe_get(comment, "ownerUsername"),
+    timestamp if timestamp else safe_get(comment, "text")
+  )
+
+def parse_timestamp(timestamp: str) -> datetime:
+  """Converte um timestamp ISO para datetime."""
+  normalized_timestamp = timestamp.replace('Z', '+00:00')
+  return datetime.fromtimestamp(
+    datetime.fromisoformat(normalized_timestamp).timestamp()
+  )
+
+def parse_timestamp_or_none(timestamp: Optional[str]) -> Optional[datetime]:
+  if not timestamp:
+    return None
+  try:
+    return parse_timestamp(timestamp)
+  except Exception:
+    return None
+
+def build_account_dimension(account: AccountDetail, account_sk: str) -> DimInstagramAccount:
+  return DimInstagramAccount(
+    account_sk=account_sk,
+    name=safe_get(account, "name"),
+    nickname=safe_get(account, "nick_name"),
+    url=safe_get(account, "url"),
+  )
+
+def build_account_fact(account: AccountDetail, account_sk: str) -> FactInstagramAccountSnapshot:
+  return FactInstagramAccountSnapshot(
+    account_sk=account_sk,
+    followers_count=safe_get(account, "followers_count") or 0,
+    follows_count=safe_get(account, "follows_count") or 0,
+    is_business=safe_get(account, "is_business") or False,
+    category=safe_get(account, "category"),
+    biography=safe_get(account, "biography"),
+  )
+
+def has_account_fact_data(account: AccountDetail) -> bool:
+  """Verifica se há dados disponíveis para o fato de conta."""
+  return any([
+    safe_get(account, "followers_count") is not None,
+    safe_get(account, "follows_count") is not None,
+    safe_get(account, "is_business") is not None,
+    safe_get(account, "category") is not None,
+    safe_get(account, "biography") is not None
+  ])
+
+def build_post_dimension(post: PostCommentsMap, account_sk: str, date_sk: str, post_sk: str) -> DimInstagramPost:
+  music_info = safe_get(post, "musicInfo")
+  video = safe_get(post, "video")
+  dimensions = safe_get(post, "dimensions")
+
+  return DimInstagramPost(
+    post_sk=post_sk,
+    account_sk=account_sk,
+    date_sk=date_sk,
+    external_code=safe_get(post, "shortCode"),
+    caption=safe_get(post, "caption"),
+    hash_tags=safe_get(post, "hashtags") or [],
+    audio_url=safe_get(post, "audioUrl"),
+    music_name=safe_get(music_info, "songName"),
+    owner_music_name=safe_get(music_info, "artistName"),
+    video_url=safe_get(video, "url"),
+    video_duration=safe_get(video, "duration"),
+    dim_height=safe_get(dimensions, "height"),
+    dim_width=safe_get(dimensions, "width"),
+    location=safe_get(post, "locationName"),
+  )
+
+def build_post_fact(post: PostCommentsMap, account_sk: str, post_sk: str, date_sk: str) -> FactInstagramPostMetrics:
+  video = safe_get(post, "video")
+
+  return FactInstagramPostMetrics(
+    account_sk=account_sk,
+    post_sk=post_sk,
+    comments_count=safe_get(post, "commentsCount") or 0,
+    likes_count=safe_get(post, "likesCount") or 0,
+    video_url=None,  # Schema não tem este campo
+    video_duration=None,  # Schema não tem este campo
+    video_view_count=safe_get(video, "viewCount"),
+    video_play_count=safe_get(video, "playCount"),
+    dim_height=None,  # Schema não tem este campo
+    dim_width=None,  # Schema não tem este campo
+    location=None,  # Schema não tem este campo
+    date_sk=date_sk,
+  )
+
+def has_post_fact_data(post: PostCommentsMap) -> bool:
+  """Verifica se há dados disponíveis para o fato de post."""
+  video = safe_get(post, "video")
+  return any([
+    safe_get(post, "commentsCount") is not None,
+    safe_get(post, "likesCount") is not None,
+    safe_get(video, "viewCount") is not None,
+    safe_get(video, "playCount") is not None
+  ])
+
+def build_comment_dimension(comment: dict, post_sk: str, account_sk: str,
+                            comment_sk: str, date_sk: str) -> DimInstagramComment:
+  return DimInstagramComment(
+    comment_sk=comment_sk,
+    post_sk=post_sk,
+    account_sk=account_sk,
+    owner_username=safe_get(comment, "ownerUsername"),
+    date_sk=date_sk,
+  )
+
+def build_comment_fact(comment: dict, post_sk: str, account_sk: str,
+                       comment_sk: str, date_sk: str) -> FactInstagramCommentMetrics:
+  return FactInstagramCommentMetrics(
+    account_sk=account_sk,
+    post_sk=post_sk,
+    comment_sk=comment_sk,
+    text=safe_get(comment, "text"),
+    owner_pic_url=safe_get(comment, "ownerProfilePicUrl"),
+    replies_count=safe_get(comment, "repliesCount") or 0,
+    likes_count=safe_get(comment, "likesCount") or 0,
+    date_sk=date_sk,
+  )
+
+def has_comment_fact_data(comment: dict) -> bool:
+  """Verifica se há dados disponíveis para o fato de comentário."""
+  return any([
+    safe_get(comment, "text") is not None,
+    safe_get(comment, "ownerProfilePicUrl") is not None,
+    safe_get(comment, "repliesCount") is not None,
+    safe_get(comment, "likesCount") is not None
+  ])
@@ -1,20 +1,49 @@
 import sys
-from confluent_kafka import Consumer,KafkaError, KafkaException
+import time
+from confluent_kafka import Consumer,KafkaError, KafkaException, TopicPartition
 import asyncio
-import json
 
 from ...env import CoreEnv
+from ...utils import json_codec
+from .producer import producer
 
-async def retrive_data_topic_loop(topics: list[str], callback):
+DEAD_LETTER_SUFFIX = "_dead_letter"
+
+def _retry_delay(attempt: int, base_seconds: float, max_seconds: float = 60.0) -> float:
+  return min(max_seconds, base_seconds * (2 ** (attempt - 1)))
+
+async def retrive_data_topic_loop(topics: list[str], callback, group_id: str = 'load_raw_data'):
+  """Consome os tópicos chamando `callback` para cada mensagem e commita ao terminar.
+
+  Se o callback falhar, o offset não é commitado: o consumidor volta (seek) para
+  a mensagem e tenta de novo com backoff exponencial. Depois de
+  KAFKA_CONSUMER_MAX_ATTEMPTS tentativas a mensagem vai para o tópico
+  `<tópico>_dead_letter` e o offset é commitado, para não travar a partição.
+  """
   loop = asyncio.get_event_loop()
+  env = CoreEnv()
   
   conf_consumer = {
-    'bootstrap.servers': CoreEnv().kafka_cluster_host,
-    'group.id': 'load_raw_data',
+    'bootstrap.servers': env.kafka_cluster_host,
+    'group.id': group_id,
     'auto.offset.reset': 'earliest', 
     'enable.auto.commit': 'false'
   }
   consumer = Consumer(conf_consumer)
+  # Tentativas por mensagem (tópico, partição, offset) que ainda não foi commitada.
+  attempts: dict[tuple, int] = {}
+
+  def _handle(msg):
+    data = json_codec.loads(msg.value())
+    if asyncio.iscoroutinefunction(callback):
+      # Callback assíncrono roda no event loop; o commit só acontece ao terminar
+      asyncio.run_coroutine_threadsafe(callback(data), loop).result()
+    else:
+      callback(data)
+
+  def _dead_letter(msg):
+    producer.produce(topic=f"{msg.topic()}{DEAD_LETTER_SUFFIX}", key=msg.key(), value=msg.value())
+    producer.flush()
 
   def _consume():
     try:
@@ -29,14 +58,30 @@ async def retrive_data_topic_loop(topics: list[str], callback):
             sys.stderr.write('%% %s [%d] reached end at offset %d\n' %(msg.topic(), msg.partition(), msg.offset()))
           else:
             raise KafkaException(msg.error())
-        else:
-          data = json.loads(msg.value().decode('utf-8'))
-          callback(data)
-          consumer.commit(asynchronous=False)  
+          continue
+
+        position = (msg.topic(), msg.partition(), msg.offset())
+        try:
+          _handle(msg)
+        except Exception as e:
+          attempt = attempts.get(position, 0) + 1
+          if attempt < env.kafka_consumer_max_attempts:
+            attempts[position] = attempt
+            delay = _retry_delay(attempt, env.kafka_consumer_retry_backoff_seconds)
+            print(f"Erro ao processar a mensagem {position} (tentativa {attempt}), nova tentativa em {delay:.1f}s: {e}")
+            # Sem commit: volta para a mesma mensagem e tenta de novo.
+            consumer.seek(TopicPartition(msg.topic(), msg.partition(), msg.offset()))
+            time.sleep(delay)
+            continue
+          print(f"Mensagem {position} falhou {attempt} vezes, enviada para {msg.topic()}{DEAD_LETTER_SUFFIX}: {e}")
+          _dead_letter(msg)
+
+        attempts.pop(position, None)
+        consumer.commit(message=msg, asynchronous=False)
     except Exception as e:
       print(f"Error to receive message kafka: {e}")
       raise e
     finally:
       consumer.close()
 
-  await loop.run_in_executor(None, _consume)
\ No newline at end of file
+  await loop.run_in_executor(None, _consume)
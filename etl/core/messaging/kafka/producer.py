@@ -1,23 +1,28 @@
 from confluent_kafka import Producer
 import socket
-import json
 import asyncio
 
 from ...env import CoreEnv
+from ...utils import json_codec
 
 conf_producer = {'bootstrap.servers': CoreEnv().kafka_cluster_host,'client.id': socket.gethostname()}
 producer = Producer(conf_producer)
 
-async def send_message_topic(topic: str, value: dict | list[dict]):
+async def send_message_topic(topic: str, value: dict | list[dict], key: str | None = None, flush: bool = False):
   loop = asyncio.get_event_loop()
 
   def _produce():
     try:
       producer.produce(
           topic=topic,
-          value=json.dumps(value).encode('utf-8')
+          key=key.encode('utf-8') if key is not None else None,
+          value=json_codec.dumps(value)
       )
-      producer.poll(0)
+      if flush:
+        # Espera a entrega, para quem precisa dela antes de commitar o offset.
+        producer.flush()
+      else:
+        producer.poll(0)
     except Exception as e:
         print(f"Error to send message kafka: {e}")
         raise e
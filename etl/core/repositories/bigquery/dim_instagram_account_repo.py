@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, Optional
 from ...db.bigquery import bigquery_client
+from .row_buffer import bigquery_row_buffer
 from core.utils.serialize import serialize_dataclass
 from core.entities.instagram import DimInstagramAccount
 
@@ -19,4 +20,11 @@ class DimInstagramAccountRepo:
 
     return result
 
+  def save_buffered(self, entities: List[DimInstagramAccount], row_ids: Optional[List[str]] = None):
+    """Acumula as linhas no buffer compartilhado; a gravação acontece no flush.
+
+    `row_ids` identifica cada linha para deduplicação (insertId no streaming).
+    """
+    bigquery_row_buffer.add(self.table_id, serialize_dataclass(entities), row_ids)
+
 dim_instagram_account_repo = DimInstagramAccountRepo()
\ No newline at end of file
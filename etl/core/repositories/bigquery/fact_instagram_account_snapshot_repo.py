@@ -1,6 +1,7 @@
 from ...db.bigquery import bigquery_client
+from .row_buffer import bigquery_row_buffer
 from core.utils.serialize import serialize_dataclass
-from typing import List
+from typing import List, Optional
 from core.entities.instagram import FactInstagramAccountSnapshot
 
 class FactInstagramAccountSnapshotRepo:
@@ -19,4 +20,11 @@ class FactInstagramAccountSnapshotRepo:
 
     return result
 
+  def save_buffered(self, entities: List[FactInstagramAccountSnapshot], row_ids: Optional[List[str]] = None):
+    """Acumula as linhas no buffer compartilhado; a gravação acontece no flush.
+
+    `row_ids` identifica cada linha para deduplicação (insertId no streaming).
+    """
+    bigquery_row_buffer.add(self.table_id, serialize_dataclass(entities), row_ids)
+
 fact_instagram_account_snapshot_repo = FactInstagramAccountSnapshotRepo()
\ No newline at end of file
@@ -1,8 +1,9 @@
 from ...db.bigquery import bigquery_client
+from .row_buffer import bigquery_row_buffer
 
 from core.entities.instagram import FactInstagramCommentMetrics
 from core.utils.serialize import serialize_dataclass
-from typing import List
+from typing import List, Optional
 class FactInstagramCommentMetricsRepo:
   dataset_id = "instagram_data"
   table_name = "fact_instagram_comment_metrics"
@@ -19,4 +20,11 @@ class FactInstagramCommentMetricsRepo:
 
     return result
 
+  def save_buffered(self, entities: List[FactInstagramCommentMetrics], row_ids: Optional[List[str]] = None):
+    """Acumula as linhas no buffer compartilhado; a gravação acontece no flush.
+
+    `row_ids` identifica cada linha para deduplicação (insertId no streaming).
+    """
+    bigquery_row_buffer.add(self.table_id, serialize_dataclass(entities), row_ids)
+
 fact_instagram_comment_metrics_repo = FactInstagramCommentMetricsRepo()
\ No newline at end of file
@@ -1,7 +1,8 @@
 from ...db.bigquery import bigquery_client
+from .row_buffer import bigquery_row_buffer
 from core.utils.serialize import serialize_dataclass
 from core.entities.instagram import FactInstagramPostMetrics
-from typing import List
+from typing import List, Optional
 
 class FactInstagramPostMetricsRepo:
   dataset_id = "instagram_data"
@@ -19,4 +20,11 @@ class FactInstagramPostMetricsRepo:
 
     return result
 
+  def save_buffered(self, entities: List[FactInstagramPostMetrics], row_ids: Optional[List[str]] = None):
+    """Acumula as linhas no buffer compartilhado; a gravação acontece no flush.
+
+    `row_ids` identifica cada linha para deduplicação (insertId no streaming).
+    """
+    bigquery_row_buffer.add(self.table_id, serialize_dataclass(entities), row_ids)
+
 fact_instagram_post_metrics_repo = FactInstagramPostMetricsRepo()
\ No newline at end of file
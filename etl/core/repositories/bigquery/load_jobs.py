@@ -0,0 +1,25 @@
+from typing import Any, List, Optional
+
+from google.cloud import bigquery
+from ...db.bigquery import bigquery_client
+
+def _load_from_gcs(table_id: str, uri: str, source_format: str, schema: Optional[List[Any]] = None):
+  job = bigquery_client.load_table_from_uri(
+    uri,
+    table_id,
+    job_config=bigquery.LoadJobConfig(
+      source_format=source_format,
+      write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+      schema=schema
+    )
+  )
+
+  return job.result()
+
+def load_parquet_from_gcs(table_id: str, uri: str):
+  """Carrega um arquivo Parquet do GCS na tabela com um load job (sem custo de ingestão)."""
+  return _load_from_gcs(table_id, uri, bigquery.SourceFormat.PARQUET)
+
+def load_ndjson_from_gcs(table_id: str, uri: str, schema: Optional[List[Any]] = None):
+  """Carrega um arquivo NDJSON (pode estar em gzip) do GCS na tabela com um load job."""
+  return _load_from_gcs(table_id, uri, bigquery.SourceFormat.NEWLINE_DELIMITED_JSON, schema)
@@ -0,0 +1,93 @@
+from dataclasses import fields
+from typing import List
+
+from core.entities.instagram import DimDate, DimInstagramAccount, DimInstagramComment, DimInstagramPost
+
+SCD_TYPE_1 = 1
+SCD_TYPE_2 = 2
+
+# Colunas de versão das dimensões em SCD tipo 2 (infra/bigquery/migrations/003).
+SCD2_COLUMNS = ("valid_from", "valid_to", "is_current")
+
+# Ordem de chegada da linha no flush, gravada só na staging.
+STAGING_SEQUENCE_COLUMN = "_row_sequence"
+
+MERGE_KEYS = {
+  "dim_instagram_account": "account_sk",
+  "dim_instagram_post": "post_sk",
+  "dim_instagram_comment": "comment_sk",
+  "dim_date": "date_sk",
+}
+
+# O MERGE só compara e atualiza as colunas gravadas pelo ETL (os campos da
+# entidade). As demais, como as enrichment_* preenchidas depois pelo
+# enriching consumer, ficam como estão na dimensão.
+MERGE_ENTITIES = {
+  "dim_instagram_account": DimInstagramAccount,
+  "dim_instagram_post": DimInstagramPost,
+  "dim_instagram_comment": DimInstagramComment,
+  "dim_date": DimDate,
+}
+
+# Só estas dimensões têm as colunas de SCD2_COLUMNS.
+SCD2_TABLES = ("dim_instagram_account", "dim_instagram_post", "dim_instagram_comment")
+
+def merge_columns(table_name: str) -> List[str]:
+  return [field.name for field in fields(MERGE_ENTITIES[table_name])]
+
+def _deduplicated_staging(staging_table_id: str, key: str, columns: List[str]) -> str:
+  # Um arquivo pode ter a mesma entidade mais de uma vez; o MERGE aceita só uma
+  # linha por chave, e fica a última recebida.
+  return (
+    f"SELECT {', '.join(columns)} FROM `{staging_table_id}` WHERE TRUE "
+    f"QUALIFY ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY {STAGING_SEQUENCE_COLUMN} DESC) = 1"
+  )
+
+def _changed(target: str, source: str, columns: List[str]) -> str:
+  # TO_JSON_STRING compara também NULLs e arrays (ex.: hash_tags), que `!=` não cobre.
+  return (
+    f"TO_JSON_STRING(STRUCT({', '.join(f'{target}.{column}' for column in columns)})) != "
+    f"TO_JSON_STRING(STRUCT({', '.join(f'{source}.{column}' for column in columns)}))"
+  )
+
+def build_merge_scd1(table_id: str, staging_table_id: str, key: str, columns: List[str]) -> str:
+  """MERGE SCD tipo 1: a linha da entidade é atualizada no lugar, ou inserida se for nova."""
+  tracked = [column for column in columns if column != key]
+  return f"""
+MERGE `{table_id}` T
+USING ({_deduplicated_staging(staging_table_id, key, columns)}) S
+ON T.{key} = S.{key}
+WHEN MATCHED AND {_changed("T", "S", tracked)} THEN
+  UPDATE SET {', '.join(f'{column} = S.{column}' for column in tracked)}
+WHEN NOT MATCHED THEN
+  INSERT ({', '.join(columns)}) VALUES ({', '.join(f'S.{column}' for column in columns)})
+"""
+
+def build_merge_scd2(table_id: str, staging_table_id: str, key: str, columns: List[str]) -> str:
+  """MERGE SCD tipo 2: uma entidade alterada tem a versão atual encerrada e ganha uma nova.
+
+  A chave substituta é a chave durável da entidade, compartilhada pelas
+  versões; a versão atual é a com `is_current`. Cada entidade alterada entra
+  duas vezes na origem: com `merge_key` para encerrar a versão atual e com
+  `merge_key` nulo para inserir a nova.
+  """
+  tracked = [column for column in columns if column != key]
+  return f"""
+MERGE `{table_id}` T
+USING (
+  WITH staged AS ({_deduplicated_staging(staging_table_id, key, columns)})
+  SELECT S.{key} AS merge_key, S.* FROM staged S
+  UNION ALL
+  SELECT CAST(NULL AS STRING) AS merge_key, S.* FROM staged S
+  WHERE EXISTS (
+    SELECT 1 FROM `{table_id}` C
+    WHERE C.{key} = S.{key} AND C.is_current AND {_changed("C", "S", tracked)}
+  )
+) S
+ON T.{key} = S.merge_key AND T.is_current
+WHEN MATCHED AND {_changed("T", "S", tracked)} THEN
+  UPDATE SET is_current = FALSE, valid_to = CURRENT_TIMESTAMP()
+WHEN NOT MATCHED BY TARGET THEN
+  INSERT ({', '.join(columns)}, {', '.join(SCD2_COLUMNS)})
+  VALUES ({', '.join(f'S.{column}' for column in columns)}, CURRENT_TIMESTAMP(), NULL, TRUE)
+"""
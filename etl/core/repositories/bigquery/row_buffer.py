@@ -0,0 +1,189 @@
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from .sinks import RowSink, create_row_sinks
+from core.env import CoreEnv
+from core.mappers.bigquery_columns import to_table_row
+from core.utils import json_codec
+
+class BigQueryInsertError(RuntimeError):
+  """Linhas recusadas pelo sink; o arquivo não pode ser dado como carregado."""
+
+  def __init__(self, errors: List[dict]):
+    self.errors = errors
+    super().__init__(f"{len(errors)} linhas recusadas pelo BigQuery: {errors[:3]}")
+
+class BigQueryRowBuffer:
+  """Acumula linhas por tabela e grava em lote no sink configurado para ela.
+
+  As linhas são projetadas nas colunas da tabela (`to_table_row`) ao entrar,
+  então todos os sinks recebem os nomes do schema do BigQuery.
+
+  Uma tabela é gravada antes do flush quando chega aos limites do seu sink
+  (`max_rows` linhas ou `max_bytes` de JSON); `flush` grava o que sobrou de
+  todas as tabelas em paralelo. As métricas por tabela incluem latência,
+  vazão e o custo de ingestão estimado pelo sink.
+
+  Cada linha tem um id (o informado ou um uuid4). Ids já aceitos pelo
+  processo, até `dedup_cache_size` mais recentes, são descartados em `add`,
+  então reprocessar o mesmo arquivo no mesmo processo não grava nada. Tabelas
+  em modo MERGE recebem todas as linhas, já que o MERGE é idempotente e
+  precisa da versão mais nova da entidade.
+
+  Erros das gravações feitas dentro de `add` ficam guardados e são devolvidos
+  pelo próximo `flush`, junto com os dele.
+  """
+
+  def __init__(
+    self,
+    default_sink: RowSink,
+    table_sinks: Optional[Dict[str, RowSink]] = None,
+    dedup_cache_size: int = 0
+  ):
+    self._default_sink = default_sink
+    self._table_sinks = table_sinks or {}
+    self._dedup_cache_size = dedup_cache_size
+    self._seen_row_ids: "OrderedDict[str, None]" = OrderedDict()
+    self._rows: Dict[str, List[dict]] = {}
+    self._sizes: Dict[str, List[int]] = {}
+    self._row_ids: Dict[str, List[str]] = {}
+    self._bytes: Dict[str, int] = {}
+    self._metrics: Dict[str, Dict[str, Any]] = {}
+    self._add_errors: List[dict] = []
+
+  def sink_for(self, table_id: str) -> RowSink:
+    return self._table_sinks.get(table_id.rsplit(".", 1)[-1], self._default_sink)
+
+  def add(self, table_id: str, rows: List[dict], row_ids: Optional[List[str]] = None):
+    sink = self.sink_for(table_id)
+    table_name = table_id.rsplit(".", 1)[-1]
+    for row, row_id in zip(rows, row_ids or [None] * len(rows)):
+      row = to_table_row(table_name, row)
+      row_id = row_id or str(uuid4())
+      if sink.deduplicates_rows:
+        if row_id in self._seen_row_ids:
+          self._table_metrics(table_id)["deduplicated"] += 1
+          continue
+        self._remember(row_id)
+
+      size = len(json_codec.dumps(row))
+      if self._rows.get(table_id) and sink.max_bytes is not None and self._bytes[table_id] + size > sink.max_bytes:
+        self._add_errors.extend(self.flush_table(table_id))
+
+      self._rows.setdefault(table_id, []).append(row)
+      self._sizes.setdefault(table_id, []).append(size)
+      self._row_ids.setdefault(table_id, []).append(row_id)
+      self._bytes[table_id] = self._bytes.get(table_id, 0) + size
+      if sink.max_rows is not None and len(self._rows[table_id]) >= sink.max_rows:
+        self._add_errors.extend(self.flush_table(table_id))
+
+  def flush_table(self, table_id: str) -> List[dict]:
+    rows = self._rows.pop(table_id, None)
+    sizes = self._sizes.pop(table_id, [])
+    row_ids = self._row_ids.pop(table_id, [])
+    self._bytes.pop(table_id, None)
+    if not rows:
+      return []
+    return self._record(table_id, rows, sizes, *self._write(table_id, rows, sizes, row_ids))
+
+  def flush(self) -> List[dict]:
+    errors, self._add_errors = self._add_errors, []
+    table_ids = [table_id for table_id in self._rows if self._rows[table_id]]
+    if not table_ids:
+      return errors
+
+    batches = [
+      (table_id, self._rows.pop(table_id), self._sizes.pop(table_id), self._row_ids.pop(table_id))
+      for table_id in table_ids
+    ]
+    self._bytes.clear()
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+      results = list(executor.map(lambda batch: self._write(*batch), batches))
+
+    for (table_id, rows, sizes, _), result in zip(batches, results):
+      errors.extend(self._record(table_id, rows, sizes, *result))
+    return errors
+
+  def clear(self):
+    """Descarta as linhas ainda não gravadas, por exemplo quando o arquivo falhou no meio.
+
+    Os ids delas deixam de contar como vistos, para que a reentrega grave as linhas.
+    """
+    for row_ids in self._row_ids.values():
+      self._forget(row_ids)
+    self._rows.clear()
+    self._sizes.clear()
+    self._row_ids.clear()
+    self._bytes.clear()
+    self._add_errors.clear()
+
+  def _remember(self, row_id: str):
+    if self._dedup_cache_size <= 0:
+      return
+    self._seen_row_ids[row_id] = None
+    if len(self._seen_row_ids) > self._dedup_cache_size:
+      self._seen_row_ids.popitem(last=False)
+
+  def _forget(self, row_ids: List[str]):
+    for row_id in row_ids:
+      self._seen_row_ids.pop(row_id, None)
+
+  def _write(self, table_id: str, rows: List[dict], sizes: List[int], row_ids: List[str]):
+    started_at = time.perf_counter()
+    try:
+      errors = self.sink_for(table_id).write(table_id, rows, sizes, row_ids)
+    except Exception:
+      self._forget(row_ids)
+      raise
+    # Linhas recusadas (erros por linha do insert_rows_json) não foram gravadas.
+    self._forget([row_ids[error["index"]] for error in errors if "index" in error])
+    return errors, time.perf_counter() - started_at
+
+  def _table_metrics(self, table_id: str) -> Dict[str, Any]:
+    return self._metrics.setdefault(table_id, {
+      "mode": self.sink_for(table_id).mode, "flushes": 0, "rows": 0, "bytes": 0, "errors": 0, "deduplicated": 0,
+      "latency_total_seconds": 0.0, "latency_max_seconds": 0.0, "estimated_cost_usd": 0.0
+    })
+
+  def _record(self, table_id: str, rows: List[dict], sizes: List[int], errors: List[dict], latency: float) -> List[dict]:
+    sink = self.sink_for(table_id)
+    metrics = self._table_metrics(table_id)
+    metrics["flushes"] += 1
+    metrics["rows"] += len(rows)
+    metrics["bytes"] += sum(sizes)
+    metrics["errors"] += len(errors)
+    metrics["latency_total_seconds"] += latency
+    metrics["latency_max_seconds"] = max(metrics["latency_max_seconds"], latency)
+    metrics["estimated_cost_usd"] += sink.estimated_cost(table_id, sizes)
+
+    if errors:
+      print(f"Erros ao inserir {len(errors)} de {len(rows)} linhas em {table_id}: {errors[:3]}")
+    return errors
+
+  def metrics(self) -> Dict[str, Dict[str, Any]]:
+    return {
+      table_id: {
+        **metrics,
+        "latency_average_seconds": metrics["latency_total_seconds"] / max(1, metrics["flushes"]),
+        "rows_per_second": metrics["rows"] / (metrics["latency_total_seconds"] or 1e-9),
+      }
+      for table_id, metrics in self._metrics.items()
+    }
+
+def _parse_table_sink_modes(value: str) -> Dict[str, str]:
+  """Lê `tabela=modo,tabela=modo` (ex.: `dim_date=load_job_parquet`)."""
+  modes = {}
+  for entry in filter(None, (part.strip() for part in (value or "").split(","))):
+    table_name, _, mode = entry.partition("=")
+    modes[table_name.strip()] = mode.strip()
+  return modes
+
+def _create_row_buffer() -> BigQueryRowBuffer:
+  env = CoreEnv()
+  default_sink, table_sinks = create_row_sinks(env.bigquery_sink_mode, _parse_table_sink_modes(env.bigquery_table_sink_modes))
+  return BigQueryRowBuffer(default_sink, table_sinks, dedup_cache_size=env.bigquery_dedup_cache_size)
+
+bigquery_row_buffer = _create_row_buffer()
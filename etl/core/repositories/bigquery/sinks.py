@@ -0,0 +1,284 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from google.cloud import bigquery
+from ...db.bigquery import bigquery_client
+from .load_jobs import load_ndjson_from_gcs, load_parquet_from_gcs
+from .merge import (
+  MERGE_KEYS, SCD2_TABLES, SCD_TYPE_1, SCD_TYPE_2, STAGING_SEQUENCE_COLUMN,
+  build_merge_scd1, build_merge_scd2, merge_columns
+)
+from core.env import CoreEnv
+from core.infra.gcs.storage import storage_gcs
+from core.infra.gcs.types import UploadFile, ValidExtension
+from core.utils.ndjson import FORMAT_NDJSON_GZIP, write_ndjson_files
+from core.utils.parquet import build_arrow_table, write_parquet_rows
+
+try:
+  from google.cloud import bigquery_storage_v1
+  from google.cloud.bigquery_storage_v1 import types as storage_types, writer as storage_writer
+except ImportError:
+  bigquery_storage_v1 = None
+
+SINK_STREAMING = "streaming"
+SINK_LOAD_JOB_NDJSON = "load_job_ndjson"
+SINK_LOAD_JOB_PARQUET = "load_job_parquet"
+SINK_STORAGE_WRITE_COMMITTED = "storage_write_committed"
+SINK_STORAGE_WRITE_PENDING = "storage_write_pending"
+SINK_MERGE_SCD1 = "merge_scd1"
+SINK_MERGE_SCD2 = "merge_scd2"
+
+# Preços de tabela do BigQuery (região US, sob demanda):
+# - streaming insert: US$ 0,01 a cada 200 MB, cada linha conta no mínimo 1 KB;
+# - Storage Write API: US$ 0,025 por GB (os primeiros 2 TB do mês são gratuitos);
+# - load job: sem custo de ingestão, usa o pool compartilhado de slots;
+# - query (MERGE): US$ 6,25 por TiB processado.
+STREAMING_INSERT_USD_PER_BYTE = 0.01 / (200 * 1024 * 1024)
+STREAMING_INSERT_MIN_ROW_BYTES = 1024
+STORAGE_WRITE_USD_PER_BYTE = 0.025 / (1024 * 1024 * 1024)
+QUERY_USD_PER_BYTE = 6.25 / (1024 ** 4)
+
+STAGING_TABLE_EXPIRATION = timedelta(days=1)
+
+# Uma requisição AppendRows aceita até 10 MB.
+STORAGE_WRITE_APPEND_MAX_BYTES = 8 * 1024 * 1024
+
+class RowSink:
+  """Destino das linhas acumuladas pelo BigQueryRowBuffer.
+
+  `max_rows` e `max_bytes` dizem quando o buffer deve gravar uma tabela antes
+  do flush final (None = só no flush). `write` recebe as linhas serializadas,
+  o tamanho em JSON e o id de cada uma, e retorna os erros por linha, se houver.
+  """
+  mode: str
+  max_rows: Optional[int] = None
+  max_bytes: Optional[int] = None
+  # Sinks que atualizam a linha existente (MERGE) precisam receber a entidade
+  # de novo, então o buffer não descarta ids repetidos para eles.
+  deduplicates_rows = True
+
+  def write(self, table_id: str, rows: List[dict], row_sizes: List[int], row_ids: List[str]) -> List[dict]:
+    raise NotImplementedError
+
+  def estimated_cost(self, table_id: str, row_sizes: List[int]) -> float:
+    return 0.0
+
+class StreamingInsertSink(RowSink):
+  """Streaming insert legado (`insert_rows_json`): linhas visíveis na hora.
+
+  O id de cada linha vai como insertId, e o BigQuery descarta (em regime de
+  melhor esforço, por alguns minutos) uma linha repetida com o mesmo id.
+  """
+  mode = SINK_STREAMING
+
+  def __init__(self, max_rows: int, max_bytes: int):
+    self.max_rows = max_rows
+    self.max_bytes = max_bytes
+
+  def write(self, table_id: str, rows: List[dict], row_sizes: List[int], row_ids: List[str]) -> List[dict]:
+    return bigquery_client.insert_rows_json(table=table_id, json_rows=rows, row_ids=row_ids)
+
+  def estimated_cost(self, table_id: str, row_sizes: List[int]) -> float:
+    return sum(max(size, STREAMING_INSERT_MIN_ROW_BYTES) for size in row_sizes) * STREAMING_INSERT_USD_PER_BYTE
+
+class LoadJobSink(RowSink):
+  """Grava as linhas em um arquivo NDJSON (gzip) ou Parquet no GCS e carrega com um load job.
+
+  Cada flush vira um load job, que é atômico e não tem custo de ingestão, mas
+  conta na cota diária de load jobs por tabela; por isso a tabela só é
+  gravada no flush do arquivo inteiro. Os arquivos de staging ficam no bucket
+  para auditoria e devem ser removidos por uma regra de ciclo de vida.
+  """
+
+  def __init__(self, file_format: str, bucket_name: str, prefix: str):
+    self.mode = SINK_LOAD_JOB_PARQUET if file_format == ValidExtension.PARQUET.value else SINK_LOAD_JOB_NDJSON
+    self._bucket_name = bucket_name
+    self._prefix = prefix
+
+  def write(self, table_id: str, rows: List[dict], row_sizes: List[int], row_ids: List[str]) -> List[dict]:
+    table_name = table_id.rsplit(".", 1)[-1]
+    if self.mode == SINK_LOAD_JOB_PARQUET:
+      extension, buffer, load = ValidExtension.PARQUET, write_parquet_rows(table_name, rows), load_parquet_from_gcs
+    else:
+      buffer, _ = next(write_ndjson_files(rows, lambda row: row, FORMAT_NDJSON_GZIP, max_bytes=sum(row_sizes) + len(rows), max_records=len(rows)))
+      extension, load = ValidExtension.NDJSON_GZIP, load_ndjson_from_gcs
+
+    saved = storage_gcs.upload_file(UploadFile(
+      bucket_name=self._bucket_name,
+      file_name=f"{self._prefix}/{table_name}/",
+      extension=extension,
+      buffer=buffer
+    ))
+    load(table_id=table_id, uri=f"gs://{saved['saved_path']}")
+    return []
+
+class StorageWriteSink(RowSink):
+  """Storage Write API com linhas em Arrow, uma write stream por flush.
+
+  Na stream `committed` as linhas ficam visíveis a cada append, e os offsets
+  evitam duplicar um append repetido. Na `pending` nada aparece até o commit
+  da stream, então cada flush entra na tabela inteiro ou não entra.
+  """
+  max_bytes = 256 * 1024 * 1024
+
+  def __init__(self, pending: bool):
+    if bigquery_storage_v1 is None:
+      raise ValueError("A Storage Write API requer o pacote google-cloud-bigquery-storage")
+
+    self.mode = SINK_STORAGE_WRITE_PENDING if pending else SINK_STORAGE_WRITE_COMMITTED
+    self._stream_type = storage_types.WriteStream.Type.PENDING if pending else storage_types.WriteStream.Type.COMMITTED
+    self._client = bigquery_storage_v1.BigQueryWriteClient.from_service_account_json(
+      CoreEnv().account_service_instagram_gcp
+    )
+
+  def write(self, table_id: str, rows: List[dict], row_sizes: List[int], row_ids: List[str]) -> List[dict]:
+    dataset_id, table_name = table_id.rsplit(".", 1)
+    parent = self._client.table_path(bigquery_client.project, dataset_id, table_name)
+    stream = self._client.create_write_stream(
+      parent=parent,
+      write_stream=storage_types.WriteStream(type_=self._stream_type)
+    )
+
+    table = build_arrow_table(table_name, rows)
+    append_stream = storage_writer.AppendRowsStream(self._client, storage_types.AppendRowsRequest(
+      write_stream=stream.name,
+      arrow_rows=storage_types.AppendRowsRequest.ArrowData(
+        writer_schema=storage_types.ArrowSchema(serialized_schema=table.schema.serialize().to_pybytes())
+      )
+    ))
+
+    # O tamanho em JSON superestima o Arrow, então os lotes ficam abaixo do limite.
+    rows_per_append = max(1, len(rows) * STORAGE_WRITE_APPEND_MAX_BYTES // max(1, sum(row_sizes)))
+    try:
+      futures, offset = [], 0
+      for batch in table.to_batches(max_chunksize=rows_per_append):
+        futures.append(append_stream.send(storage_types.AppendRowsRequest(
+          offset=offset,
+          arrow_rows=storage_types.AppendRowsRequest.ArrowData(
+            rows=storage_types.ArrowRecordBatch(serialized_record_batch=batch.serialize().to_pybytes())
+          )
+        )))
+        offset += batch.num_rows
+      for future in futures:
+        future.result()
+    finally:
+      append_stream.close()
+
+    self._client.finalize_write_stream(name=stream.name)
+    if self.mode == SINK_STORAGE_WRITE_PENDING:
+      self._client.batch_commit_write_streams(storage_types.BatchCommitWriteStreamsRequest(
+        parent=parent,
+        write_streams=[stream.name]
+      ))
+    return []
+
+  def estimated_cost(self, table_id: str, row_sizes: List[int]) -> float:
+    return sum(row_sizes) * STORAGE_WRITE_USD_PER_BYTE
+
+class StagingMergeSink(RowSink):
+  """Carrega o flush em uma tabela de staging e aplica um MERGE na dimensão (SCD tipo 1 ou 2).
+
+  A staging é criada por execução, com as colunas da entidade (mais a ordem
+  de chegada de cada linha) e expiração de um dia, carregada por load job a partir de um NDJSON no GCS e removida
+  depois do MERGE. A dimensão fica com uma linha por entidade (tipo 1) ou uma
+  por versão (tipo 2), em vez de uma por linha recebida. O custo é o da
+  query: o MERGE lê a dimensão inteira a cada flush.
+  """
+  deduplicates_rows = False
+
+  def __init__(self, scd_type: int, bucket_name: str, prefix: str):
+    self.mode = SINK_MERGE_SCD2 if scd_type == SCD_TYPE_2 else SINK_MERGE_SCD1
+    self._scd_type = scd_type
+    self._bucket_name = bucket_name
+    self._prefix = prefix
+    self._schemas: Dict[str, List[bigquery.SchemaField]] = {}
+    self._bytes_billed: Dict[str, int] = {}
+
+  def write(self, table_id: str, rows: List[dict], row_sizes: List[int], row_ids: List[str]) -> List[dict]:
+    table_name = table_id.rsplit(".", 1)[-1]
+    key = MERGE_KEYS[table_name]
+    columns = merge_columns(table_name)
+    schema = self._staging_schema(table_id, columns)
+
+    staged_rows = (
+      {**{column: row.get(column) for column in columns}, STAGING_SEQUENCE_COLUMN: sequence}
+      for sequence, row in enumerate(rows)
+    )
+    buffer, _ = next(write_ndjson_files(staged_rows, lambda row: row, FORMAT_NDJSON_GZIP, max_bytes=sys.maxsize, max_records=len(rows)))
+    saved = storage_gcs.upload_file(UploadFile(
+      bucket_name=self._bucket_name,
+      file_name=f"{self._prefix}/{table_name}/",
+      extension=ValidExtension.NDJSON_GZIP,
+      buffer=buffer
+    ))
+
+    staging_table = bigquery.Table(f"{bigquery_client.project}.{table_id}_staging_{uuid4().hex}", schema=schema)
+    staging_table.expires = datetime.now(timezone.utc) + STAGING_TABLE_EXPIRATION
+    bigquery_client.create_table(staging_table)
+    staging_table_id = f"{staging_table.dataset_id}.{staging_table.table_id}"
+    try:
+      load_ndjson_from_gcs(table_id=staging_table_id, uri=f"gs://{saved['saved_path']}", schema=schema)
+      build_merge = build_merge_scd2 if self._scd_type == SCD_TYPE_2 else build_merge_scd1
+      job = bigquery_client.query(build_merge(table_id, staging_table_id, key, columns))
+      job.result()
+      self._bytes_billed[table_id] = job.total_bytes_billed or 0
+    finally:
+      bigquery_client.delete_table(staging_table_id, not_found_ok=True)
+    return []
+
+  def estimated_cost(self, table_id: str, row_sizes: List[int]) -> float:
+    return self._bytes_billed.pop(table_id, 0) * QUERY_USD_PER_BYTE
+
+  def _staging_schema(self, table_id: str, columns: List[str]) -> List[bigquery.SchemaField]:
+    """Schema da staging: as colunas do MERGE com os tipos da dimensão, mais a ordem de chegada."""
+    if table_id not in self._schemas:
+      table_fields = {field.name: field for field in bigquery_client.get_table(table_id).schema}
+      self._schemas[table_id] = [
+        # Na staging todas as colunas são opcionais; a dimensão valida no MERGE.
+        bigquery.SchemaField(
+          column,
+          table_fields[column].field_type,
+          mode="REPEATED" if table_fields[column].mode == "REPEATED" else "NULLABLE"
+        )
+        for column in columns
+      ] + [bigquery.SchemaField(STAGING_SEQUENCE_COLUMN, "INTEGER", mode="REQUIRED")]
+    return self._schemas[table_id]
+
+def create_row_sink(mode: str) -> RowSink:
+  env = CoreEnv()
+  if mode == SINK_STREAMING:
+    return StreamingInsertSink(max_rows=env.bigquery_insert_max_rows, max_bytes=env.bigquery_insert_max_bytes)
+  if mode in (SINK_LOAD_JOB_NDJSON, SINK_LOAD_JOB_PARQUET):
+    file_format = ValidExtension.PARQUET.value if mode == SINK_LOAD_JOB_PARQUET else FORMAT_NDJSON_GZIP
+    return LoadJobSink(file_format, bucket_name=env.bigquery_staging_bucket, prefix=env.bigquery_staging_prefix)
+  if mode in (SINK_STORAGE_WRITE_COMMITTED, SINK_STORAGE_WRITE_PENDING):
+    return StorageWriteSink(pending=mode == SINK_STORAGE_WRITE_PENDING)
+  if mode in (SINK_MERGE_SCD1, SINK_MERGE_SCD2):
+    scd_type = SCD_TYPE_2 if mode == SINK_MERGE_SCD2 else SCD_TYPE_1
+    return StagingMergeSink(scd_type, bucket_name=env.bigquery_staging_bucket, prefix=env.bigquery_staging_prefix)
+  raise ValueError(f"Modo de gravação no BigQuery inválido: {mode}")
+
+def create_row_sinks(default_mode: str, table_modes: Dict[str, str]) -> Tuple[RowSink, Dict[str, RowSink]]:
+  """Cria o sink padrão e os sinks por tabela, com uma instância por modo usado.
+
+  Os modos de MERGE só valem por tabela, para as dimensões com chave em
+  MERGE_KEYS; o tipo 2 só para as de SCD2_TABLES.
+  """
+  if default_mode in (SINK_MERGE_SCD1, SINK_MERGE_SCD2):
+    raise ValueError(f"O modo {default_mode} só pode ser configurado por tabela (dimensões)")
+  for table_name, mode in table_modes.items():
+    if mode in (SINK_MERGE_SCD1, SINK_MERGE_SCD2) and table_name not in MERGE_KEYS:
+      raise ValueError(f"O modo {mode} não se aplica à tabela {table_name}")
+    if mode == SINK_MERGE_SCD2 and table_name not in SCD2_TABLES:
+      raise ValueError(f"A tabela {table_name} não tem as colunas de SCD tipo 2, use {SINK_MERGE_SCD1}")
+
+  sinks_by_mode: Dict[str, RowSink] = {}
+
+  def sink_for(mode: str) -> RowSink:
+    if mode not in sinks_by_mode:
+      sinks_by_mode[mode] = create_row_sink(mode)
+    return sinks_by_mode[mode]
+
+  return sink_for(default_mode), {table_name: sink_for(mode) for table_name, mode in table_modes.items()}
@@ -1,7 +1,60 @@
+import codecs
 import uuid
 from datetime import datetime, timezone
+from typing import BinaryIO, Iterator
+
+DEFAULT_READ_CHUNK_SIZE = 64 * 1024
 
 def generate_unique_filename(prefix: str, ext: str):
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
     uid = uuid.uuid4()
-    return f"{prefix}_{timestamp}_{uid}.{ext}"
\ No newline at end of file
+    return f"{prefix}_{timestamp}_{uid}.{ext}"
+
+def iter_binary_lines(file: BinaryIO, chunk_size: int = DEFAULT_READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Lê um arquivo binário em blocos e gera as linhas separadas apenas por `\\n`.
+
+    Diferente de `iter_text_lines`, separadores Unicode (U+2028, U+2029,
+    U+0085) não quebram a linha, como exige o NDJSON.
+    """
+    pending = b""
+
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            if pending:
+                yield pending.rstrip(b"\r")
+            return
+
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+
+        for line in lines:
+            yield line.rstrip(b"\r")
+
+def iter_text_lines(
+    file: BinaryIO,
+    encoding: str = "utf-8",
+    chunk_size: int = DEFAULT_READ_CHUNK_SIZE
+) -> Iterator[str]:
+    """Lê um arquivo binário em blocos e gera as linhas já decodificadas.
+
+    Apenas um bloco e a linha incompleta ficam em memória, independente do
+    tamanho do arquivo.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+
+    while True:
+        chunk = file.read(chunk_size)
+        text = pending + decoder.decode(chunk, final=not chunk)
+        lines = text.splitlines(keepends=True)
+
+        pending = ""
+        if lines and chunk and not lines[-1].endswith(("\n", "\r")):
+            pending = lines.pop()
+
+        for line in lines:
+            yield line.rstrip("\r\n")
+
+        if not chunk:
+            return
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Callable, Dict, List, Union
+
+from core.env import CoreEnv
+from core.utils.serialize import serialize_dataclass
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+CODEC_AUTO = "auto"
+CODEC_ORJSON = "orjson"
+CODEC_MSGSPEC = "msgspec"
+CODEC_JSON = "json"
+
+class JsonCodec:
+    """Codifica e decodifica JSON em bytes, aceitando dataclasses diretamente.
+
+    orjson e msgspec serializam dataclasses sem passar por dicts intermediários;
+    a versão da biblioteca padrão usa `serialize_dataclass` como fallback.
+    """
+
+    def __init__(self, name: str, dumps: Callable[[Any], bytes], loads: Callable[[Union[bytes, str]], Any]):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+def _stdlib_default(value: Any) -> Any:
+    if hasattr(value, "__dataclass_fields__"):
+        return serialize_dataclass(value)
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+def _create_stdlib_codec() -> JsonCodec:
+    encoder = json.JSONEncoder(default=_stdlib_default, ensure_ascii=False, separators=(",", ":"))
+    return JsonCodec(
+        name=CODEC_JSON,
+        dumps=lambda value: encoder.encode(value).encode("utf-8"),
+        loads=json.loads
+    )
+
+def _create_orjson_codec() -> JsonCodec:
+    return JsonCodec(name=CODEC_ORJSON, dumps=orjson.dumps, loads=orjson.loads)
+
+def _create_msgspec_codec() -> JsonCodec:
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return JsonCodec(name=CODEC_MSGSPEC, dumps=encoder.encode, loads=decoder.decode)
+
+_available_codecs: Dict[str, Callable[[], JsonCodec]] = {CODEC_JSON: _create_stdlib_codec}
+if msgspec is not None:
+    _available_codecs[CODEC_MSGSPEC] = _create_msgspec_codec
+if orjson is not None:
+    _available_codecs[CODEC_ORJSON] = _create_orjson_codec
+
+def available_codecs() -> List[str]:
+    return list(_available_codecs)
+
+def create_json_codec(name: str = CODEC_AUTO) -> JsonCodec:
+    """Cria o codec pedido; `auto` escolhe o mais rápido instalado (orjson, msgspec, json)."""
+    if name == CODEC_AUTO:
+        for preferred in (CODEC_ORJSON, CODEC_MSGSPEC, CODEC_JSON):
+            if preferred in _available_codecs:
+                return _available_codecs[preferred]()
+
+    if name not in _available_codecs:
+        raise ValueError(f"Codec JSON {name} não está disponível (instalados: {', '.join(_available_codecs)})")
+    return _available_codecs[name]()
+
+default_codec = create_json_codec(CoreEnv().json_codec)
+
+dumps: Callable[[Any], bytes] = default_codec.dumps
+loads: Callable[[Union[bytes, str]], Any] = default_codec.loads
@@ -0,0 +1,110 @@
+import gzip
+import zlib
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Tuple, TypeVar
+
+from core.utils import json_codec
+from core.utils.file import iter_binary_lines
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+T = TypeVar("T")
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON_GZIP = "ndjson.gz"
+FORMAT_NDJSON_ZSTD = "ndjson.zst"
+
+NDJSON_FORMATS = (FORMAT_NDJSON_GZIP, FORMAT_NDJSON_ZSTD)
+
+GZIP_COMPRESSION_LEVEL = 6
+ZSTD_COMPRESSION_LEVEL = 3
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ValueError(f"O formato {FORMAT_NDJSON_ZSTD} requer o pacote zstandard")
+
+def _create_compressor(file_format: str):
+    if file_format == FORMAT_NDJSON_GZIP:
+        # wbits=31 gera o cabeçalho gzip, legível por gzip.GzipFile.
+        return zlib.compressobj(GZIP_COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+    if file_format == FORMAT_NDJSON_ZSTD:
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=ZSTD_COMPRESSION_LEVEL).compressobj()
+    raise ValueError(f"Formato de arquivo NDJSON não suportado: {file_format}")
+
+class NdjsonFileWriter:
+    """Escreve registros como JSON por linha, comprimindo à medida que chegam."""
+
+    def __init__(self, file_format: str):
+        self._compressor = _create_compressor(file_format)
+        self._chunks: List[bytes] = []
+        self.record_count = 0
+        self.raw_size = 0
+
+    def write_line(self, line: bytes):
+        self._chunks.append(self._compressor.compress(line + b"\n"))
+        self.record_count += 1
+        self.raw_size += len(line) + 1
+
+    def close(self) -> bytes:
+        self._chunks.append(self._compressor.flush())
+        return b"".join(self._chunks)
+
+def write_ndjson_files(
+    records: Iterable[T],
+    to_json: Callable[[T], Any],
+    file_format: str,
+    max_bytes: int,
+    max_records: int
+) -> Iterator[Tuple[bytes, List[T]]]:
+    """Gera arquivos NDJSON comprimidos e os registros contidos em cada um.
+
+    Um novo arquivo é iniciado quando o atual chegaria a `max_bytes` (tamanho
+    descomprimido) ou já tem `max_records` registros. Um registro maior que
+    `max_bytes` sozinho vai em um arquivo próprio.
+    """
+    writer = None
+    written: List[T] = []
+
+    for record in records:
+        line = json_codec.dumps(to_json(record))
+
+        if writer and (
+            writer.record_count >= max_records
+            or writer.raw_size + len(line) + 1 > max_bytes
+        ):
+            yield writer.close(), written
+            writer, written = None, []
+
+        if writer is None:
+            writer = NdjsonFileWriter(file_format)
+
+        writer.write_line(line)
+        written.append(record)
+
+    if writer:
+        yield writer.close(), written
+
+def iter_ndjson_records(file: BinaryIO, file_format: str) -> Iterator[Any]:
+    """Lê um arquivo de lote em streaming e gera um registro por vez.
+
+    Arquivos no formato antigo (`json`, um único array) são lidos inteiros.
+    """
+    if file_format == FORMAT_JSON:
+        yield from json_codec.loads(file.read())
+        return
+
+    if file_format == FORMAT_NDJSON_GZIP:
+        stream = gzip.GzipFile(fileobj=file, mode="rb")
+    elif file_format == FORMAT_NDJSON_ZSTD:
+        _require_zstandard()
+        stream = zstandard.ZstdDecompressor().stream_reader(file)
+    else:
+        raise ValueError(f"Formato de arquivo de lote não suportado: {file_format}")
+
+    with stream:
+        for line in iter_binary_lines(stream):
+            if line:
+                yield json_codec.loads(line)
@@ -0,0 +1,130 @@
+import io
+from dataclasses import asdict
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List
+
+from core.mappers.bigquery_columns import to_table_row
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMAT_PARQUET = "parquet"
+
+PARQUET_COMPRESSION = "zstd"
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ValueError(f"O formato {FORMAT_PARQUET} requer o pacote pyarrow")
+
+@lru_cache(maxsize=None)
+def _table_schemas() -> Dict[str, Any]:
+    """Schemas Arrow equivalentes às tabelas do BigQuery (infra/bigquery/schemas).
+
+    As colunas têm os nomes da tabela (`core.mappers.bigquery_columns`), para
+    que o arquivo possa ser carregado direto por um load job.
+    """
+    string, int64, float64, boolean = pyarrow.string(), pyarrow.int64(), pyarrow.float64(), pyarrow.bool_()
+
+    def required(name, type_):
+        return pyarrow.field(name, type_, nullable=False)
+
+    def nullable(name, type_):
+        return pyarrow.field(name, type_)
+
+    return {
+        "dim_date": pyarrow.schema([
+            required("date_sk", string),
+            required("date", pyarrow.date32()),
+            nullable("day", int64),
+            nullable("month", int64),
+            nullable("year", int64),
+            nullable("weekday", string),
+            nullable("is_weekend", boolean),
+        ]),
+        "dim_instagram_account": pyarrow.schema([
+            required("account_sk", string),
+            required("name", string),
+            required("nickname", string),
+            required("url", string),
+        ]),
+        "fact_instagram_account_snapshot": pyarrow.schema([
+            required("account_sk", string),
+            nullable("followers_count", int64),
+            nullable("follows_count", int64),
+            nullable("isBusiness", boolean),
+            nullable("category", string),
+            nullable("biography", string),
+        ]),
+        "dim_instagram_post": pyarrow.schema([
+            required("post_sk", string),
+            required("account_sk", string),
+            required("date_sk", string),
+            required("external_code", string),
+            nullable("caption", string),
+            nullable("hash_tags", pyarrow.list_(string)),
+            nullable("audio_url", string),
+            nullable("music_name", string),
+            nullable("owner_music_name", string),
+            nullable("video_url", string),
+            nullable("video_duration", float64),
+            nullable("dim_height", int64),
+            nullable("dim_width", int64),
+            nullable("location", string),
+        ]),
+        "fact_instagram_post_metrics": pyarrow.schema([
+            required("account_sk", string),
+            required("post_sk", string),
+            nullable("comments_count", int64),
+            nullable("likes_count", int64),
+            nullable("video_view_count", int64),
+            nullable("video_play_count", int64),
+            required("date_sk", string),
+        ]),
+        "dim_instagram_comment": pyarrow.schema([
+            required("comment_sk", string),
+            required("post_sk", string),
+            required("account_sk", string),
+            nullable("owner_username", string),
+            required("date_sk", string),
+        ]),
+        "fact_instagram_comment_metrics": pyarrow.schema([
+            required("account_sk", string),
+            required("post_sk", string),
+            required("comment_sk", string),
+            nullable("text", string),
+            nullable("owner_pic_url", string),
+            nullable("repliesCount", int64),
+            nullable("linkesCount", int64),
+            required("date_sk", string),
+        ]),
+    }
+
+def _to_arrow_value(value: Any, type_) -> Any:
+    if value is not None and pyarrow.types.is_date32(type_) and isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+def build_arrow_table(table_name: str, rows: Iterable[Dict[str, Any]]):
+    """Monta a tabela Arrow de uma tabela do modelo estrela a partir de linhas já serializadas."""
+    _require_pyarrow()
+    schema = _table_schemas()[table_name]
+
+    columns = {field.name: [] for field in schema}
+    for row in rows:
+        for field in schema:
+            columns[field.name].append(_to_arrow_value(row.get(field.name), field.type))
+
+    return pyarrow.Table.from_pydict(columns, schema=schema)
+
+def write_parquet_rows(table_name: str, rows: Iterable[Dict[str, Any]]) -> bytes:
+    buffer = io.BytesIO()
+    pyarrow.parquet.write_table(build_arrow_table(table_name, rows), buffer, compression=PARQUET_COMPRESSION)
+    return buffer.getvalue()
+
+def write_parquet_table(table_name: str, entities: List[Any]) -> bytes:
+    """Serializa as entidades de uma tabela do modelo estrela em um arquivo Parquet."""
+    return write_parquet_rows(table_name, (to_table_row(table_name, asdict(entity)) for entity in entities))
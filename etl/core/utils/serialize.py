@@ -1,9 +1,19 @@
-from dataclasses import asdict
-from typing import Any
+from dataclasses import fields
+from functools import lru_cache
+from typing import Any, Tuple
+
+@lru_cache(maxsize=None)
+def _dataclass_field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(field.name for field in fields(cls))
 
 def serialize_dataclass(obj: any) -> dict:
+    # Equivalente a dataclasses.asdict, mas sem deepcopy dos valores simples
+    # e com os nomes dos campos calculados uma vez por classe.
     if hasattr(obj, '__dataclass_fields__'):
-        return asdict(obj)
+        return {
+            name: serialize_dataclass(getattr(obj, name))
+            for name in _dataclass_field_names(type(obj))
+        }
     elif isinstance(obj, list):
         return [serialize_dataclass(item) for item in obj]
     elif isinstance(obj, dict):
@@ -1,9 +1,9 @@
 import sys
 from confluent_kafka import Consumer, KafkaError, KafkaException
 import asyncio
-import json
 
 from core.env import CoreEnv
+from core.utils import json_codec
 from batch_info_account_instagram_success import BatchInfoAccountInstagramSuccessTopic
 
 class Consumer:
@@ -48,7 +48,7 @@ class Consumer:
                         else:
                             raise KafkaException(msg.error())
                     else:
-                        data = json.loads(msg.value().decode('utf-8'))
+                        data = json_codec.loads(msg.value())
                         # Executa o callback assíncrono
                         future = asyncio.run_coroutine_threadsafe(topic.execute(data), loop)
                         future.result()  # Aguarda a conclusão
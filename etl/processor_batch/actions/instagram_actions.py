@@ -1,16 +1,43 @@
-from fastapi import UploadFile, HTTPException, BackgroundTasks
-from ..services.instagram_service import instagram_service
+from fastapi import UploadFile, HTTPException
+from ..services.batch_job_service import batch_job_service, JobQueueFullError
+from ..store.apify.instagram import instagram_apify
 
-async def batch_instagram_accounts(file: UploadFile, background_tasks: BackgroundTasks):
+async def batch_instagram_accounts(file: UploadFile):
     mime_type = file.content_type
     if mime_type != 'text/csv':
         raise HTTPException(status_code=400, detail="Extensão de arquivo invalida")
 
-    contents = file.file.read()
-
-    background_tasks.add_task(instagram_service.csv_batch_accounts_post_comments, contents)
+    try:
+        job = await batch_job_service.submit(file.filename, file.file)
+    except JobQueueFullError:
+        raise HTTPException(
+            status_code=429,
+            detail="Fila de processamento cheia, tente novamente mais tarde",
+            headers={"Retry-After": "60"}
+        )
 
     return {
         "message": "Arquivo recebido. O processamento iniciou em segundo plano.",
-        "filename": file.filename
-    }
\ No newline at end of file
+        "filename": file.filename,
+        "job_id": job.id
+    }
+
+async def get_batch_job(job_id: str):
+    job = batch_job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
+
+async def list_batch_jobs():
+    return [job.to_dict() for job in batch_job_service.list_jobs()]
+
+async def apify_metrics():
+    cache = instagram_apify.cache
+    return {
+        "concurrency": instagram_apify.concurrency.metrics(),
+        "cache": cache.stats() if cache is not None else None,
+        "deduplicated_fetches": instagram_apify.deduplicated_fetches,
+        "hedging": instagram_apify.hedging.metrics(),
+        "runs_timed_out": instagram_apify.runs_timed_out,
+        "runs_aborted": instagram_apify.runs_aborted
+    }
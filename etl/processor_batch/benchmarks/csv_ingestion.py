@@ -0,0 +1,58 @@
+"""Compara o pico de RSS da leitura do CSV de contas em memória vs streaming.
+
+Uso (a partir de etl/):
+  python -m processor_batch.benchmarks.csv_ingestion 10000 100000 1000000
+
+Cada medição roda em um processo próprio, pois ru_maxrss só cresce.
+"""
+import multiprocessing
+import resource
+import sys
+import tempfile
+
+from processor_batch.services.accounts_reader import iter_csv_accounts
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+def _write_csv(path: str, size: int):
+  with open(path, "w", encoding="utf-8") as file:
+    file.write("account\n")
+    for i in range(size):
+      file.write(f"@instagram_account_{i}\n")
+
+def _read_in_memory(path: str) -> int:
+  with open(path, "rb") as file:
+    lines = file.read().decode("utf-8").splitlines()
+  lines.pop(0)
+  return len(lines)
+
+def _read_streaming(path: str) -> int:
+  with open(path, "rb") as file:
+    return sum(1 for _ in iter_csv_accounts(file))
+
+def _measure(reader, path: str, queue: multiprocessing.Queue):
+  baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  count = reader(path)
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  queue.put((count, peak, peak - baseline))
+
+def _run(reader, path: str):
+  queue = multiprocessing.Queue()
+  process = multiprocessing.Process(target=_measure, args=(reader, path, queue))
+  process.start()
+  result = queue.get()
+  process.join()
+  return result
+
+def main(sizes):
+  print(f"{'contas':>10} {'modo':>10} {'pico RSS (KB)':>14} {'delta (KB)':>11}")
+  for size in sizes:
+    with tempfile.NamedTemporaryFile(suffix=".csv") as tmp:
+      _write_csv(tmp.name, size)
+      for name, reader in (("memória", _read_in_memory), ("streaming", _read_streaming)):
+        count, peak, delta = _run(reader, tmp.name)
+        assert count == size
+        print(f"{size:>10} {name:>10} {peak:>14} {delta:>11}")
+
+if __name__ == "__main__":
+  main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
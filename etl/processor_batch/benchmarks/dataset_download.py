@@ -0,0 +1,96 @@
+"""Compara a leitura serial do dataset (iterate_items) com a leitura paginada em paralelo.
+
+Uso (a partir de etl/):
+  python -m processor_batch.benchmarks.dataset_download [itens] [latência_ms] [MB/s]
+
+O dataset é simulado a partir de mocks/post_comments_from_account_dataset.json,
+com latência fixa por requisição e tempo de transferência proporcional ao tamanho
+da página, como em uma leitura real da API do Apify.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("APIFY_TOKEN", "benchmark")
+os.environ.setdefault("ACTOR_INSTAGRAM", "benchmark")
+os.environ.setdefault("APIFY_CACHE_TTL_SECONDS", "0")
+
+from processor_batch.store.apify.instagram import InstagramApiFy, RESULTS_TYPE_POSTS
+
+MOCK_PATH = Path(__file__).resolve().parent.parent / "mocks" / "post_comments_from_account_dataset.json"
+ITERATE_ITEMS_PAGE_SIZE = 1000
+
+class _FakeDataset:
+  def __init__(self, items, latency: float, bytes_per_second: float):
+    self._items = items
+    self._sizes = [len(json.dumps(item)) for item in items]
+    self._latency = latency
+    self._bytes_per_second = bytes_per_second
+    self.requests = 0
+
+  async def list_items(self, offset: int = 0, limit: int = None):
+    self.requests += 1
+    end = len(self._items) if limit is None else offset + limit
+    await asyncio.sleep(self._latency + sum(self._sizes[offset:end]) / self._bytes_per_second)
+    return SimpleNamespace(items=self._items[offset:end], total=len(self._items))
+
+  async def iterate_items(self):
+    offset = 0
+    while offset < len(self._items):
+      page = await self.list_items(offset=offset, limit=ITERATE_ITEMS_PAGE_SIZE)
+      for item in page.items:
+        yield item
+      offset += ITERATE_ITEMS_PAGE_SIZE
+
+class _FakeActor:
+  async def start(self, run_input, **kwargs):
+    return {"id": "run", "status": "SUCCEEDED", "defaultDatasetId": "dataset"}
+
+class _FakeClient:
+  def __init__(self, dataset: _FakeDataset):
+    self._dataset = dataset
+
+  def actor(self, actor_id):
+    return _FakeActor()
+
+  def dataset(self, dataset_id):
+    return self._dataset
+
+def _load_items(size: int):
+  items = json.loads(MOCK_PATH.read_text(encoding="utf-8"))
+  return [items[i % len(items)] for i in range(size)]
+
+async def _serial(dataset: _FakeDataset) -> int:
+  items = []
+  async for item in dataset.iterate_items():
+    items.append(item)
+  return len(items)
+
+async def _paged(dataset: _FakeDataset) -> int:
+  apify = InstagramApiFy(client=_FakeClient(dataset))
+  items_by_account = await apify._fetch_instagram_data_batch(["humansofny"], RESULTS_TYPE_POSTS)
+  return len(items_by_account["humansofny"])
+
+async def main(size: int, latency_ms: float, megabytes_per_second: float):
+  items = _load_items(size)
+  print(f"{size} itens, {latency_ms} ms por requisição, {megabytes_per_second} MB/s")
+
+  for name, reader in (("iterate_items", _serial), ("paginado", _paged)):
+    dataset = _FakeDataset(items, latency_ms / 1000, megabytes_per_second * 1024 * 1024)
+    started_at = time.perf_counter()
+    count = await reader(dataset)
+    elapsed = time.perf_counter() - started_at
+    assert count == size
+    print(f"{name:>14}: {elapsed:6.2f}s, {count / elapsed:8.0f} itens/s, {dataset.requests} requisições")
+
+if __name__ == "__main__":
+  args = sys.argv[1:]
+  asyncio.run(main(
+    size=int(args[0]) if len(args) > 0 else 2000,
+    latency_ms=float(args[1]) if len(args) > 1 else 150,
+    megabytes_per_second=float(args[2]) if len(args) > 2 else 5
+  ))
@@ -0,0 +1,168 @@
+"""Compara o mapeamento antigo dos itens do Apify (safe_get + asdict) com o compilado.
+
+Uso (a partir de etl/):
+  python -m processor_batch.benchmarks.item_mapping [repetições]
+
+Usa mocks/post_comments_from_account_dataset.json e mede, para cada versão,
+itens/segundo no mapeamento e na serialização para JSON, além da memória e do
+número de blocos alocados que ficam retidos pelas entidades mapeadas.
+"""
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from core.utils.serialize import safe_get, serialize_dataclass
+from processor_batch.services.instagram_mappers import map_post_comments
+
+MOCK_PATH = Path(__file__).resolve().parent.parent / "mocks" / "post_comments_from_account_dataset.json"
+
+# Entidades e mapper como eram antes (dataclasses com __dict__ e safe_get por campo).
+@dataclass
+class _MusicInfo:
+  artistName: Optional[str]
+  songName: Optional[str]
+
+@dataclass
+class _Dimensions:
+  height: Optional[int]
+  width: Optional[int]
+
+@dataclass
+class _VideoInfo:
+  url: Optional[str]
+  viewCount: Optional[int]
+  playCount: Optional[int]
+  duration: Optional[float]
+
+@dataclass
+class _CommentDetail:
+  text: Optional[str]
+  ownerUsername: Optional[str]
+  ownerProfilePicUrl: Optional[str]
+  repliesCount: Optional[int]
+  likesCount: Optional[int]
+  timestamp: Optional[str]
+
+@dataclass
+class _PostCommentsMap:
+  shortCode: Optional[str]
+  caption: Optional[str]
+  hashtags: Optional[List[str]]
+  audioUrl: Optional[str]
+  musicInfo: Optional[_MusicInfo]
+  commentsCount: Optional[int]
+  likesCount: Optional[int]
+  dimensions: Optional[_Dimensions]
+  video: Optional[_VideoInfo]
+  locationName: Optional[str]
+  timestamp: Optional[str]
+  latest_comments: Optional[List[_CommentDetail]]
+
+def _legacy_map(post: dict) -> _PostCommentsMap:
+  music_info = None
+  if post.get("musicInfo"):
+    music_info = _MusicInfo(
+      artistName=safe_get(post, "musicInfo", "artistName"),
+      songName=safe_get(post, "musicInfo", "songName")
+    )
+
+  dimensions = None
+  if safe_get(post, "dimensionsHeight") or safe_get(post, "dimensionsWidth"):
+    dimensions = _Dimensions(
+      height=safe_get(post, "dimensionsHeight"),
+      width=safe_get(post, "dimensionsWidth")
+    )
+
+  video = None
+  if safe_get(post, "videoUrl") or safe_get(post, "videoViewCount") or safe_get(post, "videoPlayCount") or safe_get(post, "videoDuration"):
+    video = _VideoInfo(
+      url=safe_get(post, "videoUrl"),
+      viewCount=safe_get(post, "videoViewCount"),
+      playCount=safe_get(post, "videoPlayCount"),
+      duration=safe_get(post, "videoDuration")
+    )
+
+  latest_comments = None
+  if post.get("latestComments"):
+    latest_comments = [
+      _CommentDetail(
+        text=safe_get(comment, "text"),
+        ownerUsername=safe_get(comment, "ownerUsername"),
+        ownerProfilePicUrl=safe_get(comment, "ownerProfilePicUrl"),
+        repliesCount=safe_get(comment, "repliesCount"),
+        likesCount=safe_get(comment, "likesCount"),
+        timestamp=safe_get(comment, "timestamp")
+      )
+      for comment in post.get("latestComments", [])
+    ]
+
+  return _PostCommentsMap(
+    shortCode=safe_get(post, "shortCode"),
+    caption=safe_get(post, "caption"),
+    hashtags=safe_get(post, "hashtags"),
+    audioUrl=safe_get(post, "audioUrl"),
+    musicInfo=music_info,
+    commentsCount=safe_get(post, "commentsCount"),
+    likesCount=safe_get(post, "likesCount"),
+    dimensions=dimensions,
+    video=video,
+    locationName=safe_get(post, "locationName"),
+    timestamp=safe_get(post, "timestamp"),
+    latest_comments=latest_comments
+  )
+
+def _legacy_serialize(posts) -> List[dict]:
+  return [asdict(post) for post in posts]
+
+def _timed(function, repetitions: int):
+  started_at = time.perf_counter()
+  for _ in range(repetitions):
+    result = function()
+  return result, time.perf_counter() - started_at
+
+def _retained_memory(function):
+  tracemalloc.start()
+  before = tracemalloc.take_snapshot()
+  result = function()
+  after = tracemalloc.take_snapshot()
+  tracemalloc.stop()
+
+  stats = after.compare_to(before, "filename")
+  size = sum(stat.size_diff for stat in stats)
+  blocks = sum(stat.count_diff for stat in stats)
+  del result
+  return size, blocks
+
+def _run(label: str, items: List[dict], mapper, serialize, repetitions: int):
+  total = len(items) * repetitions
+
+  mapped, map_seconds = _timed(lambda: [mapper(item) for item in items], repetitions)
+  serialized, serialize_seconds = _timed(lambda: serialize(mapped), repetitions)
+  _, encode_seconds = _timed(lambda: [json.dumps(post).encode("utf-8") for post in serialized], repetitions)
+  size, blocks = _retained_memory(lambda: [mapper(item) for item in items])
+
+  print(
+    f"{label:>10}: mapeamento {total / map_seconds:>10.0f} itens/s | "
+    f"serialização {total / serialize_seconds:>10.0f} itens/s | "
+    f"json {total / encode_seconds:>8.0f} itens/s | "
+    f"retido {size / 1024:>8.1f} KB em {blocks} blocos"
+  )
+  return serialized
+
+def main():
+  repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+  items = json.loads(MOCK_PATH.read_text())
+  print(f"{len(items)} itens ({MOCK_PATH.stat().st_size / 1024 / 1024:.1f} MB), {repetitions} repetições")
+
+  legacy = _run("antigo", items, _legacy_map, _legacy_serialize, repetitions)
+  compiled = _run("compilado", items, map_post_comments, serialize_dataclass, repetitions)
+
+  if legacy != compiled:
+    raise SystemExit("As duas versões geraram resultados diferentes")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,71 @@
+"""Mede codificação e decodificação de arquivos de lote com cada codec JSON disponível.
+
+Uso (a partir de etl/):
+  python -m processor_batch.benchmarks.json_codec [contas_por_lote] [repetições]
+
+Monta um lote como o que o processor_batch grava, com as contas de
+mocks/account_dataset.json e os posts de mocks/post_comments_from_account_dataset.json.
+Compara o caminho antigo (serialize_dataclass + json.dumps) com cada codec,
+que recebe as dataclasses diretamente, e mede a leitura das mesmas linhas NDJSON.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+from core.utils.json_codec import available_codecs, create_json_codec
+from core.utils.serialize import serialize_dataclass
+from processor_batch.services.instagram_mappers import map_account_detail, map_post_comments
+
+MOCKS_DIR = Path(__file__).resolve().parent.parent / "mocks"
+
+def _build_batch(accounts_per_batch: int):
+  accounts = json.loads((MOCKS_DIR / "account_dataset.json").read_text())
+  posts = [map_post_comments(post) for post in json.loads((MOCKS_DIR / "post_comments_from_account_dataset.json").read_text())]
+  posts_per_account = max(1, len(posts) // accounts_per_batch)
+
+  return [
+    {
+      "account": map_account_detail(accounts[index % len(accounts)]),
+      "posts": posts[index * posts_per_account:(index + 1) * posts_per_account]
+    }
+    for index in range(accounts_per_batch)
+  ]
+
+def _timed(function, repetitions: int) -> float:
+  started_at = time.perf_counter()
+  for _ in range(repetitions):
+    function()
+  return (time.perf_counter() - started_at) / repetitions
+
+def _legacy_encode(batch):
+  return [
+    json.dumps({"account": serialize_dataclass(result["account"]), "posts": serialize_dataclass(result["posts"])}).encode("utf-8")
+    for result in batch
+  ]
+
+def main():
+  accounts_per_batch = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+  repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+  batch = _build_batch(accounts_per_batch)
+
+  legacy_lines = _legacy_encode(batch)
+  size = sum(len(line) for line in legacy_lines)
+  print(f"Lote com {accounts_per_batch} contas, {size / 1024 / 1024:.2f} MB em NDJSON, {repetitions} repetições")
+
+  encode = _timed(lambda: _legacy_encode(batch), repetitions)
+  decode = _timed(lambda: [json.loads(line) for line in legacy_lines], repetitions)
+  print(f"{'antigo':>8}: codificação {encode * 1000:>7.2f} ms | decodificação {decode * 1000:>7.2f} ms")
+
+  for name in available_codecs():
+    codec = create_json_codec(name)
+    lines = [codec.dumps({"account": result["account"], "posts": result["posts"]}) for result in batch]
+    if [codec.loads(line) for line in lines] != [json.loads(line) for line in legacy_lines]:
+      raise SystemExit(f"O codec {name} gerou um resultado diferente do caminho antigo")
+
+    encode = _timed(lambda: [codec.dumps({"account": result["account"], "posts": result["posts"]}) for result in batch], repetitions)
+    decode = _timed(lambda: [codec.loads(line) for line in lines], repetitions)
+    print(f"{name:>8}: codificação {encode * 1000:>7.2f} ms | decodificação {decode * 1000:>7.2f} ms")
+
+if __name__ == "__main__":
+  main()
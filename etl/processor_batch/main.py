@@ -1,13 +1,40 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, UploadFile, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile
 
-from .actions.instagram_actions import batch_instagram_accounts
+from .actions.instagram_actions import (
+    batch_instagram_accounts,
+    get_batch_job,
+    list_batch_jobs,
+    apify_metrics
+)
+from .services.batch_job_service import batch_job_service
+from .services.instagram_service import instagram_service
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await batch_job_service.start()
+    yield
+    await batch_job_service.stop()
+    instagram_service.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 @app.post("/api/batch-instagram-accounts")
-async def root(file: UploadFile, background_tasks: BackgroundTasks):
-    return await batch_instagram_accounts(file, background_tasks)
\ No newline at end of file
+async def root(file: UploadFile):
+    return await batch_instagram_accounts(file)
+
+@app.get("/api/batch-instagram-accounts/jobs")
+async def jobs():
+    return await list_batch_jobs()
+
+@app.get("/api/batch-instagram-accounts/jobs/{job_id}")
+async def job(job_id: str):
+    return await get_batch_job(job_id)
+
+@app.get("/api/apify-metrics")
+async def metrics():
+    return await apify_metrics()
\ No newline at end of file
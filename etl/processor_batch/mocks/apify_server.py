@@ -0,0 +1,201 @@
+"""Servidor local que imita a API do Apify usada pelo processor_batch.
+
+Atende início, consulta, listagem e cancelamento de execuções do actor e a
+leitura paginada de datasets, devolvendo os mocks desta pasta. Serve para
+testes de carga sem gastar créditos do Apify:
+
+  uvicorn processor_batch.mocks.apify_server:app --port 8010
+  APIFY_API_URL=http://localhost:8010 make processor_batch_service
+
+Configuração por variáveis de ambiente:
+  APIFY_STANDIN_RUN_SECONDS      duração mediana de uma execução (padrão 2)
+  APIFY_STANDIN_RUN_TAIL_SIGMA   sigma do log-normal que espalha a duração (padrão 0.5)
+  APIFY_STANDIN_PAGE_LATENCY_MS  latência de cada página do dataset (padrão 50)
+  APIFY_STANDIN_ERROR_RATE       fração de execuções que terminam em FAILED (padrão 0)
+  APIFY_STANDIN_RATE_LIMIT_RATE  fração de inícios respondidos com 429 (padrão 0)
+  APIFY_STANDIN_POSTS_PER_PROFILE posts por perfil; padrão usa o resultsLimit da execução
+"""
+import asyncio
+import gzip
+import json
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+MOCKS_DIR = Path(__file__).resolve().parent
+ACCOUNT_MOCK = json.loads((MOCKS_DIR / "account_dataset.json").read_text(encoding="utf-8"))[0]
+POSTS_MOCK = json.loads((MOCKS_DIR / "post_comments_from_account_dataset.json").read_text(encoding="utf-8"))
+
+RUN_SECONDS = float(os.getenv("APIFY_STANDIN_RUN_SECONDS", "2"))
+RUN_TAIL_SIGMA = float(os.getenv("APIFY_STANDIN_RUN_TAIL_SIGMA", "0.5"))
+PAGE_LATENCY_SECONDS = float(os.getenv("APIFY_STANDIN_PAGE_LATENCY_MS", "50")) / 1000
+ERROR_RATE = float(os.getenv("APIFY_STANDIN_ERROR_RATE", "0"))
+RATE_LIMIT_RATE = float(os.getenv("APIFY_STANDIN_RATE_LIMIT_RATE", "0"))
+POSTS_PER_PROFILE = os.getenv("APIFY_STANDIN_POSTS_PER_PROFILE")
+
+MAX_WAIT_FOR_FINISH_SECONDS = 60
+
+class _StandInRun:
+  def __init__(self, actor_id: str, run_input: Dict[str, Any]):
+    self.id = uuid.uuid4().hex
+    self.dataset_id = uuid.uuid4().hex
+    self.actor_id = actor_id
+    self.profile_urls: List[str] = run_input.get("directUrls") or []
+    self.results_type: str = run_input.get("resultsType", "posts")
+    self.items_per_profile = 1
+    if self.results_type != "details":
+      self.items_per_profile = int(POSTS_PER_PROFILE or run_input.get("resultsLimit") or 10)
+
+    self.started_at = time.time()
+    self.finishes_at = self.started_at + RUN_SECONDS * random.lognormvariate(0, RUN_TAIL_SIGMA)
+    self.final_status = "FAILED" if random.random() < ERROR_RATE else "SUCCEEDED"
+    self.aborted_at: Optional[float] = None
+
+  @property
+  def status(self) -> str:
+    if self.aborted_at is not None:
+      return "ABORTED"
+    if time.time() < self.finishes_at:
+      return "RUNNING"
+    return self.final_status
+
+  @property
+  def item_count(self) -> int:
+    if self.status != "SUCCEEDED":
+      return 0
+    return len(self.profile_urls) * self.items_per_profile
+
+  def item(self, index: int) -> Dict[str, Any]:
+    """Gera o item sob demanda, sem manter o dataset inteiro em memória."""
+    profile_url = self.profile_urls[index // self.items_per_profile]
+    username = profile_url.rstrip("/").rsplit("/", 1)[-1]
+
+    if self.results_type == "details":
+      return {**ACCOUNT_MOCK, "inputUrl": profile_url, "username": username, "url": profile_url}
+
+    post = POSTS_MOCK[index % len(POSTS_MOCK)]
+    return {
+      **post,
+      "inputUrl": profile_url,
+      "ownerUsername": username,
+      "shortCode": f"{username}-{index % self.items_per_profile}-{post.get('shortCode')}"
+    }
+
+  def to_dict(self) -> Dict[str, Any]:
+    finished_at = None
+    if self.status != "RUNNING":
+      finished_at = self.aborted_at or self.finishes_at
+    return {
+      "id": self.id,
+      "actId": self.actor_id,
+      "status": self.status,
+      "startedAt": _iso(self.started_at),
+      "finishedAt": _iso(finished_at) if finished_at else None,
+      "defaultDatasetId": self.dataset_id,
+    }
+
+def _iso(timestamp: float) -> str:
+  return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(timestamp))
+
+runs: Dict[str, _StandInRun] = {}
+runs_by_dataset: Dict[str, _StandInRun] = {}
+
+app = FastAPI()
+
+def _get_run(run_id: str) -> _StandInRun:
+  run = runs.get(run_id)
+  if run is None:
+    raise HTTPException(status_code=404, detail="Run not found")
+  return run
+
+async def _wait_for_finish(run: _StandInRun, wait_for_finish: Optional[int]):
+  if not wait_for_finish:
+    return
+  deadline = time.time() + min(wait_for_finish, MAX_WAIT_FOR_FINISH_SECONDS)
+  while run.status == "RUNNING" and time.time() < deadline:
+    await asyncio.sleep(min(0.1, max(0, run.finishes_at - time.time())))
+
+@app.get("/v2/acts/{actor_id}")
+async def get_actor(actor_id: str):
+  return {"data": {"id": actor_id, "name": actor_id}}
+
+@app.post("/v2/acts/{actor_id}/runs")
+async def start_run(actor_id: str, request: Request, waitForFinish: Optional[int] = None):
+  if random.random() < RATE_LIMIT_RATE:
+    return JSONResponse(
+      status_code=429,
+      content={"error": {"type": "rate-limit-exceeded", "message": "Stand-in rate limit"}}
+    )
+
+  # O cliente do Apify envia o input compactado com gzip.
+  body = await request.body()
+  if request.headers.get("content-encoding") == "gzip":
+    body = gzip.decompress(body)
+
+  run = _StandInRun(actor_id, json.loads(body))
+  runs[run.id] = run
+  runs_by_dataset[run.dataset_id] = run
+
+  await _wait_for_finish(run, waitForFinish)
+  return JSONResponse(status_code=201, content={"data": run.to_dict()})
+
+@app.get("/v2/acts/{actor_id}/runs")
+async def list_runs(actor_id: str, offset: int = 0, limit: int = 1000, desc: bool = False):
+  actor_runs = [run for run in runs.values() if run.actor_id == actor_id]
+  actor_runs.sort(key=lambda run: run.started_at, reverse=desc)
+  page = actor_runs[offset:offset + limit]
+  return {"data": {
+    "total": len(actor_runs),
+    "offset": offset,
+    "limit": limit,
+    "count": len(page),
+    "desc": desc,
+    "items": [run.to_dict() for run in page],
+  }}
+
+@app.get("/v2/actor-runs/{run_id}")
+async def get_run(run_id: str, waitForFinish: Optional[int] = None):
+  run = _get_run(run_id)
+  await _wait_for_finish(run, waitForFinish)
+  return {"data": run.to_dict()}
+
+@app.get("/v2/actor-runs/{run_id}/log")
+async def get_run_log(run_id: str):
+  _get_run(run_id)
+  return Response(content="", media_type="text/plain")
+
+@app.post("/v2/actor-runs/{run_id}/abort")
+async def abort_run(run_id: str):
+  run = _get_run(run_id)
+  if run.status == "RUNNING":
+    run.aborted_at = time.time()
+  return {"data": run.to_dict()}
+
+@app.get("/v2/datasets/{dataset_id}/items")
+async def list_dataset_items(dataset_id: str, offset: int = 0, limit: Optional[int] = None):
+  run = runs_by_dataset.get(dataset_id)
+  if run is None:
+    raise HTTPException(status_code=404, detail="Dataset not found")
+
+  total = run.item_count
+  end = total if limit is None else min(total, offset + limit)
+  items = [run.item(index) for index in range(offset, end)]
+
+  await asyncio.sleep(PAGE_LATENCY_SECONDS)
+  return Response(
+    content=json.dumps(items),
+    media_type="application/json",
+    headers={
+      "x-apify-pagination-total": str(total),
+      "x-apify-pagination-offset": str(offset),
+      "x-apify-pagination-count": str(len(items)),
+      "x-apify-pagination-limit": str(limit if limit is not None else total),
+      "x-apify-pagination-desc": "false",
+    }
+  )
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, List, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+FlushCallback = Callable[[List[T], int], Awaitable[None]]
+
+class AccountBatcher(Generic[T]):
+  """Agrupa resultados de contas e dispara o envio por tamanho ou por tempo.
+
+  O lote é enviado quando atinge `flush_size` itens ou quando o item mais antigo
+  espera há `flush_interval` segundos, sem depender de um grupo de contas terminar.
+  O callback recebe o lote e o total de contas enviadas até então.
+
+  O envio roda em segundo plano enquanto o próximo lote se forma; com
+  `max_pending_flushes` envios em andamento, `add` espera um deles terminar.
+
+  Se um envio falhar, o erro é guardado e levantado pelo próximo `add` e por
+  `close`, para que o job termine com falha em vez de perder o lote.
+  """
+
+  def __init__(
+    self,
+    on_flush: FlushCallback,
+    flush_size: int,
+    flush_interval: float,
+    max_pending_flushes: int = 2
+  ):
+    self._on_flush = on_flush
+    self._flush_size = flush_size
+    self._flush_interval = flush_interval
+    self._buffer: List[T] = []
+    self._oldest_at: Optional[float] = None
+    self._flushed_count = 0
+    self._max_pending_flushes = max_pending_flushes
+    self._pending_flushes: Set[asyncio.Task] = set()
+    self._error: Optional[BaseException] = None
+    self._lock = asyncio.Lock()
+    self._timer = asyncio.create_task(self._flush_periodically())
+
+  async def add(self, item: T):
+    while len(self._pending_flushes) >= self._max_pending_flushes:
+      await asyncio.wait(self._pending_flushes, return_when=asyncio.FIRST_COMPLETED)
+    self._raise_flush_error()
+
+    async with self._lock:
+      if not self._buffer:
+        self._oldest_at = time.monotonic()
+      self._buffer.append(item)
+
+      if len(self._buffer) >= self._flush_size:
+        await self._flush()
+
+  async def close(self):
+    self._timer.cancel()
+    async with self._lock:
+      await self._flush()
+    if self._pending_flushes:
+      await asyncio.wait(self._pending_flushes)
+    self._raise_flush_error()
+
+  def _raise_flush_error(self):
+    if self._error is not None:
+      raise self._error
+
+  async def _flush_periodically(self):
+    while True:
+      wait = self._flush_interval
+      if self._oldest_at is not None:
+        wait = max(0, self._oldest_at + self._flush_interval - time.monotonic())
+      await asyncio.sleep(wait)
+
+      async with self._lock:
+        if self._oldest_at is not None and time.monotonic() - self._oldest_at >= self._flush_interval:
+          await self._flush()
+
+  async def _flush(self):
+    if not self._buffer:
+      return
+
+    batch, self._buffer = self._buffer, []
+    self._oldest_at = None
+    self._flushed_count += len(batch)
+
+    task = asyncio.create_task(self._run_flush(batch, self._flushed_count))
+    self._pending_flushes.add(task)
+    task.add_done_callback(self._pending_flushes.discard)
+
+  async def _run_flush(self, batch: List[T], flushed_count: int):
+    try:
+      await self._on_flush(batch, flushed_count)
+    except Exception as e:
+      print(f"Erro ao salvar lote com {len(batch)} contas: {e}")
+      if self._error is None:
+        self._error = e
+
+class ThroughputMeter:
+  """Conta contas processadas e calcula a vazão em contas por minuto."""
+
+  def __init__(self):
+    self._started_at = time.monotonic()
+    self.processed = 0
+    self.failed = 0
+
+  def record(self, success: bool = True):
+    if success:
+      self.processed += 1
+    else:
+      self.failed += 1
+
+  @property
+  def accounts_per_minute(self) -> float:
+    elapsed = time.monotonic() - self._started_at
+    if elapsed <= 0:
+      return 0.0
+    return self.processed / elapsed * 60
+
+  def report(self) -> str:
+    return (
+      f"{self.processed} contas processadas, {self.failed} falhas, "
+      f"{self.accounts_per_minute:.1f} contas/min"
+    )
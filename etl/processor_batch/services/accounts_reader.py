@@ -0,0 +1,50 @@
+import sqlite3
+from typing import BinaryIO, Iterator
+
+from core.utils.file import iter_text_lines
+
+CSV_ACCOUNT_HEADER = "account"
+
+class InvalidAccountsCsvError(ValueError):
+  pass
+
+class _SeenAccounts:
+  """Conjunto de handles já lidos, mantido em um banco SQLite temporário em disco.
+
+  Um `set` cresceria junto com o CSV; aqui a memória fica limitada ao cache de
+  páginas do SQLite e o arquivo é removido ao fechar a conexão.
+  """
+
+  def __init__(self):
+    self._connection = sqlite3.connect("")
+    self._connection.execute("CREATE TABLE seen (account TEXT PRIMARY KEY) WITHOUT ROWID")
+
+  def add(self, account_name: str) -> bool:
+    """Registra o handle e retorna False se ele já tinha sido visto."""
+    cursor = self._connection.execute(
+      "INSERT OR IGNORE INTO seen (account) VALUES (?)", (account_name,)
+    )
+    return cursor.rowcount == 1
+
+  def close(self):
+    self._connection.close()
+
+def normalize_account_name(account_name: str) -> str:
+  return account_name.strip().replace('@', '').lower()
+
+def iter_csv_accounts(file: BinaryIO) -> Iterator[str]:
+  """Gera as contas do CSV em streaming, descartando linhas vazias e repetidas."""
+  lines = iter_text_lines(file)
+
+  header = next(lines, None)
+  if header is None or header.strip() != CSV_ACCOUNT_HEADER:
+    raise InvalidAccountsCsvError("Header inválido, esperado 'account'")
+
+  seen = _SeenAccounts()
+  try:
+    for line in lines:
+      account_name = normalize_account_name(line)
+      if account_name and seen.add(account_name):
+        yield account_name
+  finally:
+    seen.close()
@@ -0,0 +1,107 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .instagram_mappers import map_account_detail, map_post_comments
+from core.utils import json_codec
+from core.utils.serialize import serialize_dataclass
+from core.utils.ndjson import FORMAT_JSON, write_ndjson_files
+from core.utils.parquet import FORMAT_PARQUET, write_parquet_table
+from core.mappers.date_dimension import date_dimension_cache
+from core.mappers.instagram_star_schema import InstagramStarSchemaRows, map_account_to_star_schema
+
+@dataclass
+class EncodedBatchFile:
+  buffer: bytes
+  account_names: List[str]
+  table_name: Optional[str] = None
+
+@dataclass
+class EncodedBatch:
+  file_format: str
+  files: List[EncodedBatchFile]
+  account_sks: List[str] = field(default_factory=list)
+  # Linhas de dim_date geradas pelo cache para este lote (só no Parquet).
+  date_sks: List[str] = field(default_factory=list)
+
+def encode_batch(
+  results: List[dict],
+  file_format: str,
+  max_bytes: int,
+  max_records: int,
+  map_raw_items: bool = False
+) -> EncodedBatch:
+  """Converte um lote de contas nos arquivos prontos para upload.
+
+  Com `map_raw_items`, `account` e `posts` ainda são os itens crus do Apify e
+  são mapeados aqui. Só usa funções de módulo e dados simples, então pode
+  rodar em um ProcessPoolExecutor, fora do event loop.
+  """
+  if map_raw_items:
+    results = [
+      {
+        "account_name": result["account_name"],
+        "account": map_account_detail(result["account"]),
+        "posts": [map_post_comments(post) for post in result["posts"]]
+      }
+      for result in results
+    ]
+
+  if file_format == FORMAT_PARQUET:
+    return _encode_parquet_batch(results, in_worker=map_raw_items)
+
+  if file_format == FORMAT_JSON:
+    buffer = json_codec.dumps([_encode_result(result) for result in results])
+    return EncodedBatch(file_format, [EncodedBatchFile(buffer, _account_names(results))])
+
+  files = write_ndjson_files(
+    results,
+    _encode_result,
+    file_format=file_format,
+    max_bytes=max_bytes,
+    max_records=max_records
+  )
+  return EncodedBatch(file_format, [
+    EncodedBatchFile(buffer, _account_names(file_results))
+    for buffer, file_results in files
+  ])
+
+def _encode_parquet_batch(results: List[dict], in_worker: bool = False) -> EncodedBatch:
+  """Gera um arquivo Parquet por tabela do modelo estrela.
+
+  As datas geradas ficam pendentes no cache até o upload; quem envia os
+  arquivos chama `commit` ou `discard` com `date_sks`. Num processo do pool o
+  cache não é o de quem envia, então as datas são descartadas aqui e voltam a
+  ser geradas nos próximos lotes.
+  """
+  rows = InstagramStarSchemaRows()
+  account_sks = []
+  try:
+    for result in results:
+      map_account_to_star_schema(
+        serialize_dataclass(result["account"]),
+        serialize_dataclass(result["posts"]),
+        rows
+      )
+      account_sks.append(rows.dim_instagram_account[-1].account_sk)
+
+    account_names = _account_names(results)
+    files = [
+      EncodedBatchFile(write_parquet_table(table_name, entities), account_names, table_name)
+      for table_name, entities in rows.tables()
+      if entities
+    ]
+  except Exception:
+    date_dimension_cache.discard(row.date_sk for row in rows.dim_date)
+    raise
+
+  date_sks = [row.date_sk for row in rows.dim_date]
+  if in_worker:
+    date_dimension_cache.discard(date_sks)
+  return EncodedBatch(FORMAT_PARQUET, files, account_sks, date_sks)
+
+def _encode_result(result: dict) -> dict:
+  # O codec JSON serializa as dataclasses diretamente, sem convertê-las em dicts.
+  return {"account": result["account"], "posts": result["posts"]}
+
+def _account_names(results: List[dict]) -> List[str]:
+  return [result["account_name"] for result in results]
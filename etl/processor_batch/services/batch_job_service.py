@@ -0,0 +1,181 @@
+import asyncio
+import os
+import shutil
+from typing import BinaryIO, List, Optional
+from uuid import uuid4
+
+from core.env import CoreEnv
+from ..store.jobs import (
+  BatchJob,
+  JobStore,
+  JOB_STATUS_QUEUED,
+  JOB_STATUS_RUNNING,
+  JOB_STATUS_SUCCEEDED,
+  JOB_STATUS_FAILED
+)
+from .batch_progress import BatchProgress
+from .instagram_service import instagram_service
+
+UPLOAD_COPY_CHUNK_SIZE = 64 * 1024
+DISPATCH_MODE_LOCAL = "local"
+DISPATCH_MODE_KAFKA = "kafka"
+
+class JobQueueFullError(Exception):
+  pass
+
+class JobProgress(BatchProgress):
+  """Progresso de um job: contadores em memória persistidos a cada lote salvo."""
+
+  def __init__(self, store: JobStore, job: BatchJob):
+    self._store = store
+    self._job_id = job.id
+    self.accounts_read = 0
+    self.accounts_failed = 0
+    self.accounts_deduplicated = job.accounts_deduplicated
+
+  def is_done(self, account_name: str) -> bool:
+    return self._store.is_uploaded(self._job_id, account_name)
+
+  def account_read(self, account_name: str):
+    self.accounts_read += 1
+
+  def account_failed(self, account_name: str):
+    self.accounts_failed += 1
+
+  def account_deduplicated(self, account_name: str):
+    self.accounts_deduplicated += 1
+
+  def accounts_skipped(self, account_names: List[str]):
+    self._store.mark_skipped(self._job_id, account_names)
+
+  def batch_saved(self, account_names: List[str], saved_path: str):
+    self._store.mark_uploaded(self._job_id, account_names)
+    self.flush()
+
+  def flush(self):
+    self._store.save_progress(
+      self._job_id,
+      self.accounts_read,
+      self.accounts_failed,
+      self.accounts_deduplicated
+    )
+
+class BatchJobService:
+  """Fila limitada de jobs de CSV atendida por um número fixo de workers.
+
+  O CSV é copiado para JOBS_DIR e o job registrado em SQLite antes de entrar
+  na fila. Com a fila cheia o envio é recusado (JobQueueFullError). Na
+  inicialização, jobs que estavam na fila ou em andamento são retomados,
+  pulando as contas que já tinham sido enviadas.
+
+  No modo "kafka" o job apenas distribui as contas no tópico de scraping e
+  "enviada" passa a significar publicada no tópico.
+  """
+
+  def __init__(self, jobs_dir: str, queue_size: int, workers: int, dispatch_mode: str = DISPATCH_MODE_LOCAL):
+    if dispatch_mode not in (DISPATCH_MODE_LOCAL, DISPATCH_MODE_KAFKA):
+      raise ValueError(f"Modo de distribuição inválido: {dispatch_mode}")
+
+    self._dispatch_mode = dispatch_mode
+    self._jobs_dir = jobs_dir
+    self._queue_size = queue_size
+    self._workers_count = workers
+    self._store: Optional[JobStore] = None
+    self._queue: Optional[asyncio.Queue] = None
+    self._workers: List[asyncio.Task] = []
+
+  @property
+  def store(self) -> JobStore:
+    if self._store is None:
+      os.makedirs(self._jobs_dir, exist_ok=True)
+      self._store = JobStore(os.path.join(self._jobs_dir, "jobs.sqlite3"))
+    return self._store
+
+  async def start(self):
+    self._queue = asyncio.Queue(maxsize=self._queue_size)
+    self._workers = [asyncio.create_task(self._worker()) for _ in range(self._workers_count)]
+
+    pending_jobs = self.store.list_jobs(statuses=[JOB_STATUS_QUEUED, JOB_STATUS_RUNNING], limit=-1)
+    if pending_jobs:
+      print(f"Retomando {len(pending_jobs)} jobs pendentes")
+      asyncio.create_task(self._enqueue_pending(pending_jobs))
+
+  async def stop(self):
+    for worker in self._workers:
+      worker.cancel()
+    await asyncio.gather(*self._workers, return_exceptions=True)
+
+  async def submit(self, filename: Optional[str], file: BinaryIO) -> BatchJob:
+    if self._queue is None or self._queue.full():
+      raise JobQueueFullError("Fila de processamento cheia")
+
+    job_id = uuid4().hex
+    file_path = os.path.join(self._jobs_dir, f"{job_id}.csv")
+    # A cópia de um CSV grande bloquearia o event loop, então roda em uma thread.
+    await asyncio.get_running_loop().run_in_executor(None, self._copy_upload, file, file_path)
+
+    # A fila pode ter enchido durante a cópia.
+    if self._queue.full():
+      os.remove(file_path)
+      raise JobQueueFullError("Fila de processamento cheia")
+
+    job = self.store.create(filename=filename, file_path=file_path, job_id=job_id)
+    self._queue.put_nowait(job.id)
+    return job
+
+  def _copy_upload(self, file: BinaryIO, file_path: str):
+    with open(file_path, "wb") as job_file:
+      shutil.copyfileobj(file, job_file, UPLOAD_COPY_CHUNK_SIZE)
+
+  def get_job(self, job_id: str) -> Optional[BatchJob]:
+    return self.store.get(job_id)
+
+  def list_jobs(self) -> List[BatchJob]:
+    return self.store.list_jobs()
+
+  async def _enqueue_pending(self, jobs: List[BatchJob]):
+    for job in jobs:
+      await self._queue.put(job.id)
+
+  async def _worker(self):
+    while True:
+      job_id = await self._queue.get()
+      try:
+        await self._run_job(job_id)
+      finally:
+        self._queue.task_done()
+
+  async def _run_job(self, job_id: str):
+    job = self.store.get(job_id)
+    if job is None:
+      return
+
+    self.store.set_status(job.id, JOB_STATUS_RUNNING)
+    progress = JobProgress(self.store, job)
+    try:
+      with open(job.file_path, "rb") as file:
+        if self._dispatch_mode == DISPATCH_MODE_KAFKA:
+          await instagram_service.dispatch_csv_accounts(file, progress)
+        else:
+          await instagram_service.csv_batch_accounts_post_comments(file, progress)
+    except asyncio.CancelledError:
+      # Processo encerrando: o job continua como "running" e é retomado no próximo start.
+      progress.flush()
+      raise
+    except Exception as e:
+      progress.flush()
+      self.store.set_status(job.id, JOB_STATUS_FAILED, error=str(e))
+      print(f"Job {job.id} falhou: {e}")
+      return
+
+    progress.flush()
+    self.store.set_status(job.id, JOB_STATUS_SUCCEEDED)
+    os.remove(job.file_path)
+    print(f"Job {job.id} finalizado")
+
+batch_job_service = BatchJobService(
+  jobs_dir=CoreEnv().processor_jobs_dir,
+  queue_size=CoreEnv().processor_job_queue_size,
+  workers=CoreEnv().processor_job_workers,
+  dispatch_mode=CoreEnv().processor_dispatch_mode
+)
@@ -0,0 +1,29 @@
+from typing import List
+
+class BatchProgress:
+  """Pontos de acompanhamento de um processamento de CSV.
+
+  A implementação padrão não faz nada; o serviço de jobs a estende para
+  persistir o progresso e retomar o job depois de uma queda.
+  """
+
+  def is_done(self, account_name: str) -> bool:
+    """Indica se a conta já foi enviada em uma execução anterior do mesmo job."""
+    return False
+
+  def account_read(self, account_name: str):
+    pass
+
+  def account_failed(self, account_name: str):
+    pass
+
+  def account_deduplicated(self, account_name: str):
+    """Conta atendida por uma busca que já estava em andamento para o mesmo perfil."""
+    pass
+
+  def accounts_skipped(self, account_names: List[str]):
+    """Contas puladas por terem sido raspadas dentro da janela de frescor."""
+    pass
+
+  def batch_saved(self, account_names: List[str], saved_path: str):
+    pass
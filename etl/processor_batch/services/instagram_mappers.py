@@ -0,0 +1,85 @@
+from dataclasses import fields
+from typing import Callable, Dict, TypeVar
+
+from ..store.apify.instagram_types import Post
+from core.entities.pre_file_instagram import (
+    AccountDetail,
+    PostCommentsMap,
+    MusicInfo,
+    Dimensions,
+    VideoInfo,
+    CommentDetail
+)
+
+T = TypeVar("T")
+
+def compile_item_mapper(cls: Callable[..., T], source_keys: Dict[str, str]) -> Callable[[dict], T]:
+  """Monta, uma única vez, o mapeamento de um item do Apify para a entidade `cls`.
+
+  `source_keys` liga cada campo da entidade à chave do item. O mapper gerado
+  lê as chaves na ordem dos campos e cria a entidade por posição, sem
+  `safe_get` nem dicts intermediários. Como no `safe_get`, um item que não é
+  dict (ex.: `musicInfo` ou comentário malformado) vira uma entidade com os
+  campos vazios, em vez de derrubar a conta inteira.
+  """
+  keys = tuple(source_keys[field.name] for field in fields(cls))
+  empty_values = (None,) * len(keys)
+
+  def mapper(item: dict) -> T:
+    if not isinstance(item, dict):
+      return cls(*empty_values)
+    return cls(*map(item.get, keys))
+
+  return mapper
+
+map_account_detail = compile_item_mapper(AccountDetail, {
+  "name": "username",
+  "nick_name": "fullName",
+  "url": "url",
+  "followers_count": "followersCount",
+  "follows_count": "followsCount",
+  "is_business": "isBusinessAccount",
+  "category": "businessCategoryName",
+  "biography": "biography",
+})
+
+_map_music_info = compile_item_mapper(MusicInfo, {
+  "artistName": "artistName",
+  "songName": "songName",
+})
+
+_map_comment = compile_item_mapper(CommentDetail, {
+  "text": "text",
+  "ownerUsername": "ownerUsername",
+  "ownerProfilePicUrl": "ownerProfilePicUrl",
+  "repliesCount": "repliesCount",
+  "likesCount": "likesCount",
+  "timestamp": "timestamp",
+})
+
+def map_post_comments(post: Post) -> PostCommentsMap:
+  get = post.get
+
+  music_info = get("musicInfo")
+  height, width = get("dimensionsHeight"), get("dimensionsWidth")
+  video_url, view_count = get("videoUrl"), get("videoViewCount")
+  play_count, duration = get("videoPlayCount"), get("videoDuration")
+  latest_comments = get("latestComments")
+
+  return PostCommentsMap(
+    shortCode=get("shortCode"),
+    caption=get("caption"),
+    hashtags=get("hashtags"),
+    audioUrl=get("audioUrl"),
+    musicInfo=_map_music_info(music_info) if music_info else None,
+    commentsCount=get("commentsCount"),
+    likesCount=get("likesCount"),
+    dimensions=Dimensions(height, width) if height or width else None,
+    video=(
+      VideoInfo(video_url, view_count, play_count, duration)
+      if video_url or view_count or play_count or duration else None
+    ),
+    locationName=get("locationName"),
+    timestamp=get("timestamp"),
+    latest_comments=list(map(_map_comment, latest_comments)) if latest_comments else None
+  )
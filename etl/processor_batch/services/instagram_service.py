@@ -1,142 +1,447 @@
 import asyncio
-import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional
 
 from ..store.apify.instagram import instagram_apify
-from ..store.apify.instagram_types import Post, Account
+from ..store.watermarks import AccountWatermark, WatermarkStore
+from .accounts_reader import iter_csv_accounts, InvalidAccountsCsvError
+from .account_batcher import AccountBatcher, ThroughputMeter
+from .batch_progress import BatchProgress
+from .instagram_mappers import map_account_detail, map_post_comments
+from .batch_encoder import EncodedBatch, EncodedBatchFile, encode_batch
 from core.infra.gcs.storage import storage_gcs
 from core.infra.gcs.types import UploadFile, ValidExtension
 
 from core.env import CoreEnv
 from core.messaging.kafka.producer import send_message_topic
-from core.entities.pre_file_instagram import (
-    AccountDetail,
-    PostCommentsMap,
-    MusicInfo,
-    Dimensions,
-    VideoInfo,
-    CommentDetail
-)
-from core.utils.serialize import safe_get
-from core.utils.serialize import serialize_dataclass
+from core.utils.parquet import FORMAT_PARQUET
+from core.mappers.date_dimension import date_dimension_cache
+
+ACCOUNTS_TO_SCRAPE_TOPIC = "accounts_to_scrape"
+ACCOUNTS_TO_SCRAPE_FAILED_TOPIC = "accounts_to_scrape_failed"
 
 class InstagramService:
-  async def csv_batch_accounts_post_comments(self, file_content: bytes):
-    lines = file_content.decode('utf-8').splitlines()
-    if not lines or lines[0].strip() != 'account':
-        print("Erro: Header inválido no processamento background")
-        return
-    lines.pop(0)
-
-    chunk = 10
-    actual_pointer = 0
-    CONCURRENCY_LIMIT = 5
-    semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
-    while actual_pointer < len(lines):
-        lines_chunk = lines[actual_pointer:actual_pointer + chunk]
-
-        tasks = [self.__get_account_details(acc, semaphore) for acc in lines_chunk]
-        aggregate_result_tasks = await asyncio.gather(*tasks, return_exceptions=True)
-
-        valid_results = [r for r in aggregate_result_tasks if not isinstance(r, Exception)]
-
-        actual_pointer+=chunk
-
-        serialized_results = [
-            {
-                "account": serialize_dataclass(result["account"]),
-                "posts": serialize_dataclass(result["posts"])
-            }
-            for result in valid_results
-        ]
-
-        storage_saved = storage_gcs.upload_file(UploadFile(
+  ACCOUNTS_PER_RUN = 25
+  BATCH_FLUSH_SIZE = 10
+  BATCH_FLUSH_INTERVAL_SECONDS = 30
+
+  def __init__(
+    self,
+    mapping_workers: int = 0,
+    watermarks: Optional[WatermarkStore] = None,
+    freshness_seconds: float = 0
+  ):
+    # Pool de processos opcional que mapeia e codifica os lotes fora do event loop.
+    self.mapping_pool = ProcessPoolExecutor(max_workers=mapping_workers) if mapping_workers > 0 else None
+    # Com marcas d'água, posts já carregados são descartados e contas raspadas
+    # há menos de `freshness_seconds` são puladas.
+    self.watermarks = watermarks
+    self.freshness_seconds = freshness_seconds
+
+  def shutdown(self):
+    if self.mapping_pool is not None:
+      self.mapping_pool.shutdown(wait=True)
+
+  async def csv_batch_accounts_post_comments(self, file: BinaryIO, progress: Optional[BatchProgress] = None):
+    progress = progress or BatchProgress()
+    try:
+      await self.__process_accounts(iter_csv_accounts(file), progress)
+    except InvalidAccountsCsvError:
+      print("Erro: Header inválido no processamento background")
+      raise
+    finally:
+      file.close()
+
+  async def dispatch_csv_accounts(self, file: BinaryIO, progress: Optional[BatchProgress] = None):
+    """Distribui as contas do CSV no tópico ACCOUNTS_TO_SCRAPE_TOPIC em vez de processá-las aqui.
+
+    Cada mensagem leva um grupo de até ACCOUNTS_PER_RUN contas e usa a primeira
+    como chave, espalhando os grupos pelas partições. Os workers de
+    `processor_batch.scraper_worker` consomem o tópico e fazem o scraping.
+    """
+    progress = progress or BatchProgress()
+    try:
+      accounts = self.__iter_pending_accounts(iter_csv_accounts(file), progress)
+      dispatched = 0
+      while account_names := list(islice(accounts, self.ACCOUNTS_PER_RUN)):
+        await send_message_topic(
+          topic=ACCOUNTS_TO_SCRAPE_TOPIC,
+          key=account_names[0],
+          value={"accounts": account_names}
+        )
+        progress.batch_saved(account_names, ACCOUNTS_TO_SCRAPE_TOPIC)
+        dispatched += len(account_names)
+
+      print(f"{dispatched} contas enviadas para {ACCOUNTS_TO_SCRAPE_TOPIC}")
+    except InvalidAccountsCsvError:
+      print("Erro: Header inválido no processamento background")
+      raise
+    finally:
+      file.close()
+
+  async def scrape_accounts_group(self, account_names: List[str], attempt: int = 0):
+    """Faz o scraping de um grupo de contas recebido do tópico e salva os lotes.
+
+    Uma falha do grupo inteiro é propagada, e o consumidor tenta a mensagem de
+    novo. Contas que falharam sozinhas voltam para ACCOUNTS_TO_SCRAPE_TOPIC com
+    `attempt` incrementado e, esgotadas as tentativas, vão para
+    ACCOUNTS_TO_SCRAPE_FAILED_TOPIC; as duas publicações acontecem antes do
+    commit do offset.
+    """
+    throughput = ThroughputMeter()
+    account_names = self.__skip_fresh_accounts(account_names, BatchProgress())
+    if not account_names:
+      return
+
+    try:
+      results = await self.__get_accounts_details(account_names)
+    except Exception as e:
+      # Propaga para o consumidor não commitar o offset: o grupo é reentregue.
+      print(f"Erro ao processar as contas {account_names}: {e}")
+      raise
+
+    valid_results = []
+    failed_accounts = []
+    for account_name in account_names:
+      result = results[account_name]
+      if isinstance(result, Exception):
+        print(f"Erro ao processar a conta {account_name}: {result}")
+        throughput.record(success=False)
+        failed_accounts.append(account_name)
+        continue
+      throughput.record()
+      valid_results.append(result)
+
+    for start in range(0, len(valid_results), self.BATCH_FLUSH_SIZE):
+      batch = valid_results[start:start + self.BATCH_FLUSH_SIZE]
+      await self.__save_batch(batch, start + len(batch), throughput, BatchProgress())
+
+    if failed_accounts:
+      await self.__requeue_failed_accounts(failed_accounts, attempt + 1)
+
+  async def __requeue_failed_accounts(self, account_names: List[str], attempt: int):
+    if attempt < CoreEnv().kafka_consumer_max_attempts:
+      topic = ACCOUNTS_TO_SCRAPE_TOPIC
+      message = {"accounts": account_names, "attempt": attempt}
+    else:
+      topic = ACCOUNTS_TO_SCRAPE_FAILED_TOPIC
+      message = {"accounts": account_names, "attempts": attempt}
+    await send_message_topic(topic=topic, value=message, key=account_names[0], flush=True)
+    print(f"{len(account_names)} contas com falha enviadas para {topic} (tentativa {attempt})")
+
+  def __iter_pending_accounts(self, accounts: Iterator[str], progress: BatchProgress) -> Iterator[str]:
+    for account_name in accounts:
+      progress.account_read(account_name)
+      if not progress.is_done(account_name):
+        yield account_name
+
+  @property
+  def concurrency_limit(self) -> int:
+    # Cada grupo de contas ocupa duas execuções (detalhes e posts). No modo
+    # poll o teto é a cota de execuções em andamento, não o limitador.
+    return max(1, instagram_apify.max_in_flight_runs // 2)
+
+  async def __process_accounts(self, accounts: Iterator[str], progress: BatchProgress):
+    concurrency_limit = self.concurrency_limit
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency_limit * self.ACCOUNTS_PER_RUN)
+    throughput = ThroughputMeter()
+    batcher = AccountBatcher(
+      on_flush=partial(self.__save_batch, throughput=throughput, progress=progress),
+      flush_size=self.BATCH_FLUSH_SIZE,
+      flush_interval=self.BATCH_FLUSH_INTERVAL_SECONDS
+    )
+
+    workers = [
+      asyncio.create_task(self.__account_worker(queue, batcher, throughput, progress))
+      for _ in range(concurrency_limit)
+    ]
+    try:
+      for account_name in self.__iter_pending_accounts(accounts, progress):
+        await queue.put(account_name)
+      for _ in workers:
+        await queue.put(None)
+      await asyncio.gather(*workers)
+    finally:
+      for worker in workers:
+        worker.cancel()
+      await batcher.close()
+      print("Processamento finalizado:", throughput.report())
+      if instagram_apify.cache is not None:
+        print("Cache do Apify:", instagram_apify.cache.stats())
+
+  async def __account_worker(
+    self,
+    queue: asyncio.Queue,
+    batcher: AccountBatcher,
+    throughput: ThroughputMeter,
+    progress: BatchProgress
+  ):
+    finished = False
+    while not finished:
+      account_names, finished = await self.__next_accounts_group(queue)
+      account_names = self.__skip_fresh_accounts(account_names, progress)
+      if not account_names:
+        continue
+
+      try:
+        results = await self.__get_accounts_details(account_names, progress)
+      except Exception as e:
+        print(f"Erro ao processar as contas {account_names}: {e}")
+        for account_name in account_names:
+          throughput.record(success=False)
+          progress.account_failed(account_name)
+        continue
+
+      for account_name in account_names:
+        result = results[account_name]
+        if isinstance(result, Exception):
+          print(f"Erro ao processar a conta {account_name}: {result}")
+          throughput.record(success=False)
+          progress.account_failed(account_name)
+          continue
+
+        throughput.record()
+        await batcher.add(result)
+
+  async def __next_accounts_group(self, queue: asyncio.Queue):
+    """Retira da fila até ACCOUNTS_PER_RUN contas para uma execução do actor.
+
+    Espera apenas pela primeira conta; as demais são as que já estão na fila.
+    Retorna também se o sinal de fim (None) foi consumido.
+    """
+    account_name = await queue.get()
+    if account_name is None:
+      return [], True
+
+    account_names = [account_name]
+    while len(account_names) < self.ACCOUNTS_PER_RUN and not queue.empty():
+      account_name = queue.get_nowait()
+      if account_name is None:
+        return account_names, True
+      account_names.append(account_name)
+
+    return account_names, False
+
+  async def __save_batch(
+    self,
+    results: List[dict],
+    actual_pointer: int,
+    throughput: ThroughputMeter,
+    progress: BatchProgress
+  ):
+    encoded = await self.__encode_batch(results)
+
+    if encoded.file_format == FORMAT_PARQUET:
+      await self.__upload_parquet_batch(encoded, actual_pointer, throughput, progress)
+    else:
+      await asyncio.gather(*[
+        self.__upload_batch_file(batch_file, encoded.file_format, actual_pointer, throughput, progress)
+        for batch_file in encoded.files
+      ])
+
+    # Só avança depois do upload: se ele falhar, os posts voltam na próxima execução.
+    if self.watermarks is not None:
+      self.watermarks.advance([result["watermark"] for result in results])
+
+  async def __encode_batch(self, results: List[dict]) -> EncodedBatch:
+    env = CoreEnv()
+    encode = partial(
+      encode_batch,
+      results,
+      file_format=env.batch_file_format,
+      max_bytes=env.batch_file_max_bytes,
+      max_records=env.batch_file_max_accounts,
+      map_raw_items=self.mapping_pool is not None
+    )
+
+    if self.mapping_pool is None:
+      return encode()
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(self.mapping_pool, encode)
+
+  async def __upload_parquet_batch(
+    self,
+    encoded: EncodedBatch,
+    actual_pointer: int,
+    throughput: ThroughputMeter,
+    progress: BatchProgress
+  ):
+    """Envia os arquivos Parquet do lote, um por tabela do modelo estrela.
+
+    As datas de dim_date do lote só contam como gravadas depois do upload; se
+    ele falhar, são descartadas para que o próximo lote as gere de novo.
+    """
+    try:
+      saved = await asyncio.gather(*[
+        storage_gcs.upload_file_async(UploadFile(
             bucket_name=CoreEnv().bucket_instagram,
-            file_name=f'instagram_account_batch({actual_pointer})',
-            extension=ValidExtension.JSON,
-            buffer=json.dumps(serialized_results)
+            file_name=f'{batch_file.table_name}/instagram_account_batch({actual_pointer})',
+            extension=ValidExtension.PARQUET,
+            buffer=batch_file.buffer
           )
         )
+        for batch_file in encoded.files
+      ])
+    except Exception:
+      date_dimension_cache.discard(encoded.date_sks)
+      raise
+    date_dimension_cache.commit(encoded.date_sks)
 
-        print("Lote salvo com sucesso", storage_saved.get("saved_path"))
-
-        await send_message_topic(topic="batch_info_account_instagram", value={ "bucket_path": storage_saved.get("saved_path")})
-
-  async def __get_account_details(self, account_name: str, semaphore: asyncio.Semaphore):
-    async with semaphore:
-        account_detail = await instagram_apify.get_instagram_account_details(account_name)
-        account_posts_comments = await instagram_apify.get_instagram_account_posts_and_comments(account_name)
-
-        account_detail_map = [self.__get_account_detail_map(account) for account in account_detail]
-        account_posts_comments_map = [self.__get_account_posts_comments_map(post) for post in account_posts_comments]
-
-        return {
-          "account": account_detail_map[0],
-          "posts": account_posts_comments_map
-        }
-
-  def __get_account_detail_map(self, account: Account) -> AccountDetail:
-     return AccountDetail(
-      name=safe_get(account, "username"),
-      nick_name=safe_get(account, "fullName"),
-      url=safe_get(account, "url"),
-      followers_count=safe_get(account, "followersCount"),
-      follows_count=safe_get(account, "followsCount"),
-      is_business=safe_get(account, "isBusinessAccount"),
-      category=safe_get(account, "businessCategoryName"),
-      biography=safe_get(account, "biography")
-     )
-
-  def __get_account_posts_comments_map(self, post: Post) -> PostCommentsMap:
-    music_info = None
-    if post.get("musicInfo"):
-      music_info = MusicInfo(
-        artistName=safe_get(post, "musicInfo", "artistName"),
-        songName=safe_get(post, "musicInfo", "songName")
-      )
+    table_paths = {
+      batch_file.table_name: storage_saved.get("saved_path")
+      for batch_file, storage_saved in zip(encoded.files, saved)
+    }
+
+    print("Lote salvo com sucesso em Parquet", table_paths, "-", throughput.report())
+    print("Concorrência do Apify:", instagram_apify.concurrency.metrics())
 
-    dimensions = None
-    if safe_get(post, "dimensionsHeight") or safe_get(post, "dimensionsWidth"):
-      dimensions = Dimensions(
-        height=safe_get(post, "dimensionsHeight"),
-        width=safe_get(post, "dimensionsWidth")
+    await send_message_topic(
+      topic="batch_info_account_instagram",
+      value={ "format": FORMAT_PARQUET, "table_paths": table_paths, "account_sks": encoded.account_sks }
+    )
+
+    if encoded.files:
+      progress.batch_saved(encoded.files[0].account_names, table_paths.get("dim_instagram_account"))
+
+  async def __upload_batch_file(
+    self,
+    batch_file: EncodedBatchFile,
+    file_format: str,
+    actual_pointer: int,
+    throughput: ThroughputMeter,
+    progress: BatchProgress
+  ):
+    storage_saved = await storage_gcs.upload_file_async(UploadFile(
+        bucket_name=CoreEnv().bucket_instagram,
+        file_name=f'instagram_account_batch({actual_pointer})',
+        extension=ValidExtension(file_format),
+        buffer=batch_file.buffer
       )
+    )
+
+    print("Lote salvo com sucesso", storage_saved.get("saved_path"), "-", throughput.report())
+    print("Concorrência do Apify:", instagram_apify.concurrency.metrics())
+
+    await send_message_topic(
+      topic="batch_info_account_instagram",
+      value={ "bucket_path": storage_saved.get("saved_path"), "format": file_format }
+    )
+
+    progress.batch_saved(batch_file.account_names, storage_saved.get("saved_path"))
 
-    video = None
-    if safe_get(post, "videoUrl") or safe_get(post, "videoViewCount") or safe_get(post, "videoPlayCount") or safe_get(post, "videoDuration"):
-      video = VideoInfo(
-        url=safe_get(post, "videoUrl"),
-        viewCount=safe_get(post, "videoViewCount"),
-        playCount=safe_get(post, "videoPlayCount"),
-        duration=safe_get(post, "videoDuration")
+  async def __get_accounts_details(self, account_names: List[str], progress: Optional[BatchProgress] = None):
+    # Detalhes e posts são compartilhados separadamente; cada conta conta uma vez.
+    deduplicated = set()
+    accounts_details, accounts_posts_comments = await asyncio.gather(
+      instagram_apify.get_instagram_accounts_details(
+        account_names,
+        item_mapper=self.__item_mapper(map_account_detail),
+        on_deduplicated=deduplicated.add
+      ),
+      instagram_apify.get_instagram_accounts_posts_and_comments(
+        account_names,
+        item_mapper=self.__item_mapper(map_post_comments),
+        on_deduplicated=deduplicated.add
       )
+    )
+    if progress is not None:
+      for account_name in deduplicated:
+        progress.account_deduplicated(account_name)
 
-    latest_comments = None
-    if post.get("latestComments"):
-      latest_comments = [
-        CommentDetail(
-          text=safe_get(comment, "text"),
-          ownerUsername=safe_get(comment, "ownerUsername"),
-          ownerProfilePicUrl=safe_get(comment, "ownerProfilePicUrl"),
-          repliesCount=safe_get(comment, "repliesCount"),
-          likesCount=safe_get(comment, "likesCount"),
-          timestamp=safe_get(comment, "timestamp")
-        )
-        for comment in post.get("latestComments", [])
-      ]
-
-    return PostCommentsMap(
-      shortCode=safe_get(post, "shortCode"),
-      caption=safe_get(post, "caption"),
-      hashtags=safe_get(post, "hashtags"),
-      audioUrl=safe_get(post, "audioUrl"),
-      musicInfo=music_info,
-      commentsCount=safe_get(post, "commentsCount"),
-      likesCount=safe_get(post, "likesCount"),
-      dimensions=dimensions,
-      video=video,
-      locationName=safe_get(post, "locationName"),
-      timestamp=safe_get(post, "timestamp"),
-      latest_comments=latest_comments
+    watermarks = self.watermarks.get_many(account_names) if self.watermarks is not None else {}
+    scraped_at = time.time()
+
+    results = {}
+    for account_name in account_names:
+      account_detail = accounts_details.get(account_name)
+      if not account_detail:
+        results[account_name] = LookupError("Conta não retornada pelo Apify")
+        continue
+
+      posts = accounts_posts_comments.get(account_name, [])
+      watermark = watermarks.get(account_name)
+      results[account_name] = {
+        "account_name": account_name,
+        "account": account_detail[0],
+        "posts": self.__posts_after_watermark(posts, watermark) if watermark else posts,
+        "watermark": self.__next_watermark(account_name, posts, scraped_at)
+      }
+
+    return results
+
+  def __skip_fresh_accounts(self, account_names: List[str], progress: BatchProgress) -> List[str]:
+    """Remove do grupo as contas raspadas há menos de `freshness_seconds`."""
+    if self.watermarks is None or self.freshness_seconds <= 0 or not account_names:
+      return account_names
+
+    fresh_since = time.time() - self.freshness_seconds
+    watermarks = self.watermarks.get_many(account_names)
+    fresh = [
+      account_name for account_name in account_names
+      if account_name in watermarks and watermarks[account_name].last_snapshot_at >= fresh_since
+    ]
+    if not fresh:
+      return account_names
+
+    print(f"{len(fresh)} contas puladas, raspadas há menos de {self.freshness_seconds:.0f}s")
+    progress.accounts_skipped(fresh)
+    fresh_names = set(fresh)
+    return [account_name for account_name in account_names if account_name not in fresh_names]
+
+  def __posts_after_watermark(self, posts: list, watermark: AccountWatermark) -> list:
+    """Descarta os posts no nível da marca d'água ou abaixo dela."""
+    new_posts = []
+    for post in posts:
+      posted_at = self.__post_posted_at(post)
+      if posted_at is not None:
+        if watermark.newest_post_at is not None and posted_at <= watermark.newest_post_at:
+          continue
+      elif self.__post_value(post, "shortCode") == watermark.newest_post_short_code:
+        continue
+      new_posts.append(post)
+    return new_posts
+
+  def __next_watermark(self, account_name: str, posts: list, scraped_at: float) -> AccountWatermark:
+    newest_post = max(
+      (post for post in posts if self.__post_posted_at(post) is not None),
+      key=self.__post_posted_at,
+      default=None
     )
+    return AccountWatermark(
+      account=account_name,
+      newest_post_at=self.__post_posted_at(newest_post) if newest_post else None,
+      newest_post_short_code=self.__post_value(newest_post, "shortCode") if newest_post else None,
+      last_snapshot_at=scraped_at
+    )
+
+  def __post_posted_at(self, post) -> Optional[float]:
+    timestamp = self.__post_value(post, "timestamp")
+    if not timestamp:
+      return None
+    try:
+      return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+      return None
+
+  def __post_value(self, post, name: str):
+    # Com o pool de mapeamento os posts ainda são os itens crus (dicts) do Apify.
+    return post.get(name) if isinstance(post, dict) else getattr(post, name)
+
+  def __item_mapper(self, mapper):
+    # Com o pool de mapeamento, os itens seguem crus e são mapeados em encode_batch.
+    return None if self.mapping_pool is not None else mapper
+
+def _create_watermark_store() -> Optional[WatermarkStore]:
+  path = CoreEnv().account_watermarks_path
+  return WatermarkStore(path) if path else None
 
-instagram_service = InstagramService()
\ No newline at end of file
+instagram_service = InstagramService(
+  mapping_workers=CoreEnv().processor_mapping_workers,
+  watermarks=_create_watermark_store(),
+  freshness_seconds=CoreEnv().account_freshness_seconds
+)
\ No newline at end of file
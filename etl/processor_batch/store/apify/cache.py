@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from core.utils import json_codec
+
+class CacheEntryWriter:
+  """Monta o payload de uma entrada do cache item a item, já codificado em JSON.
+
+  Guarda só os bytes codificados, em um único buffer, não os dicts. Se a
+  entrada passar de `max_bytes`, o buffer é descartado e ela não é gravada,
+  então a memória por entrada fica limitada a `max_bytes`.
+  """
+
+  def __init__(self, max_bytes: int):
+    self.max_bytes = max_bytes
+    self.item_count = 0
+    self.oversized = False
+    self._buffer = bytearray(b"[")
+
+  def append(self, item: Dict[str, Any]):
+    if self.oversized:
+      return
+
+    encoded = json_codec.dumps(item)
+    # +2: a vírgula e o "]" final.
+    if len(self._buffer) + len(encoded) + 2 > self.max_bytes:
+      self.oversized = True
+      self._buffer = bytearray()
+      return
+
+    if self.item_count:
+      self._buffer += b","
+    self._buffer += encoded
+    self.item_count += 1
+
+  def close(self) -> bytearray:
+    """Fecha o array JSON e retorna o payload; o bytearray vai para o SQLite sem cópia."""
+    self._buffer += b"]"
+    return self._buffer
+
+class ScrapeResultCache:
+  """Cache persistente em SQLite dos itens retornados pelo actor do Apify.
+
+  As entradas valem por `ttl_seconds` e, quando o total armazenado passa de
+  `max_bytes`, as menos acessadas recentemente são removidas. Entradas
+  maiores que `max_entry_bytes` não são guardadas.
+  """
+
+  def __init__(self, path: str, ttl_seconds: float, max_bytes: int, max_entry_bytes: Optional[int] = None):
+    self.ttl_seconds = ttl_seconds
+    self.max_bytes = max_bytes
+    self.max_entry_bytes = min(max_entry_bytes or max_bytes, max_bytes)
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+
+    self._connection = sqlite3.connect(path, isolation_level=None)
+    self._connection.execute("PRAGMA journal_mode=WAL")
+    self._connection.execute("PRAGMA synchronous=NORMAL")
+    self._connection.execute(
+      """
+      CREATE TABLE IF NOT EXISTS scrape_results (
+        key TEXT PRIMARY KEY,
+        payload BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+      )
+      """
+    )
+    self._connection.execute(
+      "CREATE INDEX IF NOT EXISTS scrape_results_accessed_at ON scrape_results (accessed_at)"
+    )
+    self._total_size = self._connection.execute(
+      "SELECT COALESCE(SUM(size), 0) FROM scrape_results"
+    ).fetchone()[0]
+
+  @staticmethod
+  def build_key(account_name: str, results_type: str, results_limit: int) -> str:
+    return f"{account_name.lower()}:{results_type}:{results_limit}"
+
+  def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+    now = time.time()
+    row = self._connection.execute(
+      "SELECT payload FROM scrape_results WHERE key = ? AND created_at >= ?",
+      (key, now - self.ttl_seconds)
+    ).fetchone()
+
+    if row is None:
+      self.misses += 1
+      return None
+
+    self._connection.execute(
+      "UPDATE scrape_results SET accessed_at = ? WHERE key = ?", (now, key)
+    )
+    self.hits += 1
+    return json_codec.loads(row[0])
+
+  def entry_writer(self) -> CacheEntryWriter:
+    return CacheEntryWriter(self.max_entry_bytes)
+
+  def set(self, key: str, items: List[Dict[str, Any]]):
+    self.set_payload(key, json_codec.dumps(items))
+
+  def set_payload(self, key: str, payload: Union[bytes, bytearray]):
+    """Grava uma entrada já codificada como array JSON (ex.: `CacheEntryWriter.close`)."""
+    if len(payload) > self.max_entry_bytes:
+      return
+
+    previous = self._connection.execute(
+      "SELECT size FROM scrape_results WHERE key = ?", (key,)
+    ).fetchone()
+    if previous is not None:
+      self._total_size -= previous[0]
+
+    now = time.time()
+    self._connection.execute(
+      "INSERT OR REPLACE INTO scrape_results (key, payload, size, created_at, accessed_at) "
+      "VALUES (?, ?, ?, ?, ?)",
+      (key, payload, len(payload), now, now)
+    )
+    self._total_size += len(payload)
+
+    if self._total_size > self.max_bytes:
+      self._evict(now)
+
+  def _evict(self, now: float):
+    """Remove primeiro as entradas expiradas e depois as menos acessadas."""
+    rows = self._connection.execute(
+      "SELECT key, size FROM scrape_results "
+      "ORDER BY created_at >= ?, accessed_at",
+      (now - self.ttl_seconds,)
+    ).fetchall()
+
+    keys_to_delete = []
+    for key, size in rows:
+      if self._total_size <= self.max_bytes:
+        break
+      keys_to_delete.append((key,))
+      self._total_size -= size
+
+    self._connection.executemany("DELETE FROM scrape_results WHERE key = ?", keys_to_delete)
+    self.evictions += len(keys_to_delete)
+
+  def stats(self) -> Dict[str, int]:
+    return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
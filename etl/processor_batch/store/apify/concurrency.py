@@ -0,0 +1,105 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Tuple
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_ERROR = "error"
+OUTCOME_RATE_LIMITED = "rate_limited"
+
+class AdaptiveConcurrencyLimiter:
+  """Limite de execuções simultâneas ajustado por AIMD (aumento aditivo, redução multiplicativa).
+
+  Cada execução bem-sucedida soma `1 / limite` ao limite, o que dá +1 a cada
+  "rodada" completa de execuções. Um 429 reduz o limite com mais força que um
+  erro comum, e uma execução cuja latência passa de `latency_tolerance` vezes a
+  média móvel, sinal de que o Apify está saturado, reduz de leve.
+  """
+
+  def __init__(
+    self,
+    initial_limit: int,
+    min_limit: int = 1,
+    max_limit: int = 50,
+    rate_limited_decrease: float = 0.5,
+    error_decrease: float = 0.8,
+    latency_decrease: float = 0.9,
+    latency_tolerance: float = 2.0,
+    latency_smoothing: float = 0.2,
+    metrics_window: int = 100
+  ):
+    self.min_limit = min_limit
+    self.max_limit = max_limit
+    self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+    self._rate_limited_decrease = rate_limited_decrease
+    self._error_decrease = error_decrease
+    self._latency_decrease = latency_decrease
+    self._latency_tolerance = latency_tolerance
+    self._latency_smoothing = latency_smoothing
+    self._latency_average = None
+    self._in_flight = 0
+    self._condition = asyncio.Condition()
+    self._outcomes: Deque[Tuple[float, str]] = deque(maxlen=metrics_window)
+    self._totals: Dict[str, int] = {OUTCOME_SUCCESS: 0, OUTCOME_ERROR: 0, OUTCOME_RATE_LIMITED: 0}
+
+  @property
+  def limit(self) -> int:
+    return int(self._limit)
+
+  @asynccontextmanager
+  async def slot(self):
+    async with self._condition:
+      await self._condition.wait_for(lambda: self._in_flight < self.limit)
+      self._in_flight += 1
+    try:
+      yield
+    finally:
+      async with self._condition:
+        self._in_flight -= 1
+        self._condition.notify_all()
+
+  def record_success(self, latency: float):
+    self._record(OUTCOME_SUCCESS)
+
+    if self._latency_average is not None and latency > self._latency_average * self._latency_tolerance:
+      self._decrease(self._latency_decrease)
+    else:
+      self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    if self._latency_average is None:
+      self._latency_average = latency
+    else:
+      self._latency_average += self._latency_smoothing * (latency - self._latency_average)
+
+  def record_error(self):
+    self._record(OUTCOME_ERROR)
+    self._decrease(self._error_decrease)
+
+  def record_rate_limited(self):
+    self._record(OUTCOME_RATE_LIMITED)
+    self._decrease(self._rate_limited_decrease)
+
+  def _decrease(self, factor: float):
+    self._limit = max(self.min_limit, self._limit * factor)
+
+  def _record(self, outcome: str):
+    self._outcomes.append((time.monotonic(), outcome))
+    self._totals[outcome] += 1
+
+  def metrics(self) -> Dict[str, Any]:
+    window = [outcome for _, outcome in self._outcomes]
+    window_size = len(window) or 1
+    return {
+      "limit": self.limit,
+      "in_flight": self._in_flight,
+      "latency_average_seconds": self._latency_average,
+      "error_rate": window.count(OUTCOME_ERROR) / window_size,
+      "rate_limited_rate": window.count(OUTCOME_RATE_LIMITED) / window_size,
+      "totals": dict(self._totals),
+    }
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+  """Espera exponencial com jitter completo para a tentativa `attempt` (0, 1, 2...)."""
+  return random.uniform(0, min(maximum, base * 2 ** attempt))
@@ -0,0 +1,81 @@
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_LATENCY_WINDOW = 200
+
+class RunHedgingPolicy:
+  """Decide quando duplicar uma execução lenta do actor, dentro de um orçamento.
+
+  Guarda a duração das últimas execuções por tipo de resultado (detalhes e
+  posts demoram de forma bem diferente). Uma execução que passa do percentil
+  `percentile` dessas durações ganha uma cópia, e vale a que terminar primeiro.
+  Cada execução principal soma `budget_ratio` ao orçamento e cada cópia gasta
+  1, então as cópias ficam limitadas a essa fração das execuções; com
+  `budget_ratio` 0 nada é duplicado e só as latências são acompanhadas.
+  """
+
+  def __init__(
+    self,
+    budget_ratio: float = 0.0,
+    percentile: float = DEFAULT_HEDGE_PERCENTILE,
+    min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+    window: int = DEFAULT_LATENCY_WINDOW,
+    max_budget: float = 5.0
+  ):
+    self.budget_ratio = budget_ratio
+    self.percentile = percentile
+    self._min_samples = min_samples
+    self._window = window
+    self._max_budget = max_budget
+    self._budget = 0.0
+    self._latencies: Dict[str, Deque[float]] = {}
+    self._totals = {"primary_runs": 0, "hedges_started": 0, "hedges_won": 0, "hedges_denied": 0}
+
+  @property
+  def enabled(self) -> bool:
+    return self.budget_ratio > 0
+
+  def record_primary(self):
+    self._totals["primary_runs"] += 1
+    self._budget = min(self._max_budget, self._budget + self.budget_ratio)
+
+  def record_latency(self, kind: str, latency: float):
+    if kind not in self._latencies:
+      self._latencies[kind] = deque(maxlen=self._window)
+    self._latencies[kind].append(latency)
+
+  def record_hedge_won(self):
+    self._totals["hedges_won"] += 1
+
+  def latency_percentile(self, kind: str) -> Optional[float]:
+    latencies = self._latencies.get(kind)
+    if not latencies or len(latencies) < self._min_samples:
+      return None
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)]
+
+  def hedge_delay(self, kind: str) -> Optional[float]:
+    """Tempo de espera antes de duplicar a execução, ou None sem histórico suficiente."""
+    if not self.enabled:
+      return None
+    return self.latency_percentile(kind)
+
+  def try_start_hedge(self) -> bool:
+    if self._budget < 1:
+      self._totals["hedges_denied"] += 1
+      return False
+    self._budget -= 1
+    self._totals["hedges_started"] += 1
+    return True
+
+  def metrics(self) -> Dict[str, Any]:
+    return {
+      "enabled": self.enabled,
+      "budget_ratio": self.budget_ratio,
+      "budget": self._budget,
+      "latency_percentile_seconds": {kind: self.latency_percentile(kind) for kind in self._latencies},
+      "totals": dict(self._totals),
+    }
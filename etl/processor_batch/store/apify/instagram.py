@@ -1,16 +1,37 @@
+import asyncio
+import math
+import time
+from collections import deque
 from os import getenv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, TypeVar
 from apify_client import ApifyClientAsync
 from apify_client.clients.resource_clients import ActorClient, DatasetClient
+from apify_client.errors import ApifyApiError
 
+from .cache import CacheEntryWriter, ScrapeResultCache
+from .concurrency import AdaptiveConcurrencyLimiter, backoff_delay
+from .run_poller import ApifyRunPoller, TERMINAL_RUN_STATUSES
+from .hedging import RunHedgingPolicy
 from .instagram_types import Post
 from core.env import CoreEnv
 
+T = TypeVar("T")
+
 INSTAGRAM_BASE_URL = "https://www.instagram.com"
 RESULTS_TYPE_POSTS = "posts"
 RESULTS_TYPE_DETAILS = "details"
 DEFAULT_RESULTS_LIMIT = 10
 DEFAULT_SEARCH_LIMIT = 1
+DEFAULT_MAX_CONCURRENT_RUNS = 10
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 2.0
+RETRY_MAX_DELAY_SECONDS = 60.0
+RETRYABLE_RUN_STATUSES = {"FAILED", "TIMED-OUT"}
+DEFAULT_DATASET_PAGE_SIZE = 250
+DEFAULT_DATASET_PAGE_CONCURRENCY = 4
+RUN_MODE_CALL = "call"
+RUN_MODE_POLL = "poll"
+DEFAULT_RUN_DEADLINE_SECONDS = 1800.0
 
 def _get_apify_token() -> str:
     token = CoreEnv().apify_token
@@ -25,14 +46,87 @@ def _get_actor_id() -> str:
     return actor_id
 
 def _create_apify_client() -> ApifyClientAsync:
+    # APIFY_API_URL permite apontar para o servidor local de processor_batch/mocks/apify_server.py
+    api_url = CoreEnv().apify_api_url
+    if api_url:
+        return ApifyClientAsync(_get_apify_token(), api_url=api_url)
     return ApifyClientAsync(_get_apify_token())
 
+def _create_scrape_cache() -> Optional[ScrapeResultCache]:
+    env = CoreEnv()
+    if env.apify_cache_ttl_seconds <= 0:
+        return None
+    return ScrapeResultCache(
+        path=env.apify_cache_path,
+        ttl_seconds=env.apify_cache_ttl_seconds,
+        max_bytes=env.apify_cache_max_bytes,
+        max_entry_bytes=env.apify_cache_max_entry_bytes
+    )
+
 client_apify = _create_apify_client()
 
+class ApifyRunError(RuntimeError):
+    def __init__(self, run_result: Dict[str, Any], message: Optional[str] = None):
+        self.status = run_result.get('status')
+        super().__init__(message or f"Execução {run_result.get('id')} do Apify terminou com status {self.status}")
+
+class ApifyRunDeadlineError(ApifyRunError):
+    def __init__(self, deadline_seconds: float):
+        # Tratado como TIMED-OUT, então entra na mesma regra de nova tentativa.
+        super().__init__(
+            {"status": "TIMED-OUT"},
+            f"Execução do Apify passou do prazo de {deadline_seconds:.0f}s e foi abortada"
+        )
+
 class InstagramApiFy:    
-    def __init__(self, client: Optional[ApifyClientAsync] = None):
+    def __init__(
+        self,
+        client: Optional[ApifyClientAsync] = None,
+        max_concurrent_runs: int = DEFAULT_MAX_CONCURRENT_RUNS,
+        concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        cache: Optional[ScrapeResultCache] = None,
+        run_mode: str = RUN_MODE_CALL,
+        poll_interval: Optional[float] = None,
+        max_in_flight_runs: Optional[int] = None,
+        dataset_page_size: int = DEFAULT_DATASET_PAGE_SIZE,
+        dataset_page_concurrency: int = DEFAULT_DATASET_PAGE_CONCURRENCY,
+        run_deadline_seconds: float = DEFAULT_RUN_DEADLINE_SECONDS,
+        hedging: Optional[RunHedgingPolicy] = None
+    ):
+        if run_mode not in (RUN_MODE_CALL, RUN_MODE_POLL):
+            raise ValueError(f"Modo de execução do Apify inválido: {run_mode}")
+
         self._client = client or client_apify
+        self.cache = cache
         self._actor_id = _get_actor_id()
+        # No modo call, limita as execuções do actor em andamento, não as contas:
+        # cada conta dispara uma execução de detalhes e outra de posts em
+        # paralelo. No modo poll, limita só as chamadas de start; as execuções
+        # em andamento são limitadas pelo poller.
+        self.concurrency = concurrency or AdaptiveConcurrencyLimiter(
+            initial_limit=max_concurrent_runs,
+            max_limit=max_concurrent_runs
+        )
+        self._max_retries = max_retries
+        self._run_mode = run_mode
+        self._dataset_page_size = dataset_page_size
+        self._dataset_page_concurrency = dataset_page_concurrency
+        self._run_poller: Optional[ApifyRunPoller] = None
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self.deduplicated_fetches = 0
+        # 0 desativa o prazo; o mesmo valor vai como timeout da execução no Apify.
+        self._run_deadline_seconds = run_deadline_seconds if run_deadline_seconds > 0 else None
+        self.hedging = hedging or RunHedgingPolicy()
+        self.runs_timed_out = 0
+        self.runs_aborted = 0
+        if run_mode == RUN_MODE_POLL:
+            self._run_poller = ApifyRunPoller(
+                self._client,
+                self._actor_id,
+                poll_interval or CoreEnv().apify_poll_interval_seconds,
+                max_in_flight_runs or CoreEnv().apify_max_in_flight_runs
+            )
     
     def _build_profile_url(self, account_name: str) -> str:
         if not account_name or not account_name.strip():
@@ -44,13 +138,13 @@ class InstagramApiFy:
     
     def _build_run_input(
         self,
-        profile_url: str,
+        profile_urls: List[str],
         results_type: str,
         results_limit: int = DEFAULT_RESULTS_LIMIT
     ) -> Dict[str, Any]:
         return {
             "addParentData": False,
-            "directUrls": [profile_url],
+            "directUrls": profile_urls,
             "enhanceUserSearchWithFacebookPage": False,
             "isUserReelFeedURL": False,
             "isUserTaggedFeedURL": False,
@@ -59,40 +153,442 @@ class InstagramApiFy:
             "searchLimit": DEFAULT_SEARCH_LIMIT,
             "searchType": "hashtag"
         }
-    
-    async def _fetch_instagram_data(
+
+    def _handle_from_url(self, url: str) -> str:
+        return url.rstrip('/').rsplit('/', 1)[-1].lower()
+
+    def _item_handle(self, item: Dict[str, Any]) -> Optional[str]:
+        input_url = item.get("inputUrl")
+        if input_url:
+            return self._handle_from_url(input_url)
+
+        username = item.get("ownerUsername") or item.get("username")
+        return username.lower() if username else None
+
+    @property
+    def max_concurrent_runs(self) -> int:
+        return self.concurrency.max_limit
+
+    @property
+    def max_in_flight_runs(self) -> int:
+        """Máximo de execuções do actor em andamento ao mesmo tempo."""
+        if self._run_poller is not None:
+            return self._run_poller.max_in_flight
+        return self.concurrency.max_limit
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, ApifyApiError):
+            return error.status_code == 429 or error.status_code >= 500
+        if isinstance(error, ApifyRunError):
+            return error.status in RETRYABLE_RUN_STATUSES
+        return False
+
+    async def _run_actor(self, run_input: Dict[str, Any]) -> str:
+        """Executa o actor e retorna o id do dataset gerado.
+
+        Limites de taxa, erros 5xx e execuções que falharam são repetidos com
+        espera exponencial, até `max_retries` vezes.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._run_actor_once(run_input)
+            except Exception as e:
+                if attempt >= self._max_retries or not self._is_retryable(e):
+                    raise
+
+                delay = backoff_delay(attempt, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS)
+                print(f"Execução do Apify falhou ({e}), nova tentativa em {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _run_actor_once(self, run_input: Dict[str, Any]) -> str:
+        actor_client: ActorClient = self._client.actor(self._actor_id)
+        if self._run_poller is not None:
+            # A vaga do poller vale até a execução terminar; o slot do
+            # limitador só cobre a chamada de start (_start_and_wait).
+            async with self._run_poller.slot():
+                run_result = await self._run_with_deadline(actor_client, run_input)
+        else:
+            run_result = await self._limited(lambda: self._run_with_deadline(actor_client, run_input))
+
+        if 'defaultDatasetId' not in run_result:
+            raise RuntimeError(
+                f"Resposta do Apify não contém 'defaultDatasetId'. "
+                f"Resposta: {run_result}"
+            )
+
+        return run_result['defaultDatasetId']
+
+    async def _limited(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """Executa `operation` ocupando um slot do limitador AIMD e informa o resultado a ele."""
+        async with self.concurrency.slot():
+            started_at = time.monotonic()
+            try:
+                result = await operation()
+            except ApifyApiError as e:
+                if e.status_code == 429:
+                    self.concurrency.record_rate_limited()
+                else:
+                    self.concurrency.record_error()
+                raise
+            except Exception:
+                self.concurrency.record_error()
+                raise
+
+            self.concurrency.record_success(time.monotonic() - started_at)
+            return result
+
+    async def _run_with_deadline(self, actor_client: ActorClient, run_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa o actor com prazo e, se habilitado, com uma cópia para execuções lentas.
+
+        Passado o percentil de latência do tipo de resultado, uma segunda
+        execução igual é iniciada (se o orçamento permitir) e vale a primeira
+        que terminar com sucesso. A outra, e qualquer execução que estoure o
+        prazo, é abortada pela API do Apify.
+        """
+        kind = run_input.get("resultsType", "")
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        started_runs: List[Dict[str, Any]] = []
+        self.hedging.record_primary()
+        primary = asyncio.create_task(self._start_and_wait(actor_client, run_input, started_runs))
+        pending = {primary}
+        hedge_at = self.hedging.hedge_delay(kind)
+        winner: Optional[Dict[str, Any]] = None
+        errors: List[Exception] = []
+
+        try:
+            while pending:
+                elapsed = loop.time() - started_at
+                timeouts = [limit - elapsed for limit in (hedge_at, self._run_deadline_seconds) if limit is not None]
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, min(timeouts)) if timeouts else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                    elif winner is None:
+                        winner = task.result()
+                        if task is not primary:
+                            self.hedging.record_hedge_won()
+                if winner is not None:
+                    return winner
+
+                elapsed = loop.time() - started_at
+                if self._run_deadline_seconds is not None and elapsed >= self._run_deadline_seconds:
+                    self.runs_timed_out += 1
+                    raise ApifyRunDeadlineError(self._run_deadline_seconds)
+
+                if hedge_at is not None and elapsed >= hedge_at:
+                    hedge_at = None
+                    if pending and self.hedging.try_start_hedge():
+                        print(f"Execução do Apify ({kind}) passou de {elapsed:.0f}s, iniciando uma cópia")
+                        pending.add(asyncio.create_task(self._start_hedge(actor_client, run_input, started_runs)))
+
+            raise errors[0]
+        finally:
+            for task in pending:
+                task.cancel()
+            await self._abort_runs([
+                run for run in started_runs
+                if winner is None or run["id"] != winner.get("id")
+            ])
+
+    async def _start_hedge(
         self,
-        account_name: str,
+        actor_client: ActorClient,
+        run_input: Dict[str, Any],
+        started_runs: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Inicia a cópia da execução lenta.
+
+        No modo poll a cópia ocupa uma vaga própria da cota de execuções. No
+        modo call ela conta só no orçamento de hedging (`try_start_hedge`): a
+        execução original segura sua vaga do limitador até a cópia terminar,
+        então esperar uma segunda vaga pode travar quando todas as vagas estão
+        com execuções lentas.
+        """
+        if self._run_poller is not None:
+            async with self._run_poller.slot():
+                return await self._start_and_wait(actor_client, run_input, started_runs)
+        return await self._start_and_wait(actor_client, run_input, started_runs)
+
+    async def _start_and_wait(
+        self,
+        actor_client: ActorClient,
+        run_input: Dict[str, Any],
+        started_runs: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        def start_run():
+            return actor_client.start(
+                run_input=run_input,
+                timeout_secs=math.ceil(self._run_deadline_seconds) if self._run_deadline_seconds else None
+            )
+
+        run = await (self._limited(start_run) if self._run_poller is not None else start_run())
+        started_runs.append(run)
+        started_at = time.monotonic()
+
+        if self._run_poller is not None:
+            # Inicia sem esperar; o término é detectado pelo polling compartilhado.
+            run_result = await self._run_poller.wait(run)
+        elif run.get("status") in TERMINAL_RUN_STATUSES:
+            run_result = run
+        else:
+            run_result = await self._client.run(run["id"]).wait_for_finish() or run
+
+        run["status"] = run_result.get("status")
+        if run_result.get('status') not in (None, 'SUCCEEDED'):
+            raise ApifyRunError(run_result)
+
+        self.hedging.record_latency(run_input.get("resultsType", ""), time.monotonic() - started_at)
+        return run_result
+
+    async def _abort_runs(self, runs: List[Dict[str, Any]]):
+        """Aborta execuções que ainda estão rodando, ignorando falhas: o timeout no Apify cobre o resto."""
+        runs = [run for run in runs if run.get("status") not in TERMINAL_RUN_STATUSES]
+        if not runs:
+            return
+
+        results = await asyncio.gather(
+            *[self._client.run(run["id"]).abort() for run in runs],
+            return_exceptions=True
+        )
+        for run, result in zip(runs, results):
+            if isinstance(result, Exception):
+                print(f"Não foi possível abortar a execução {run['id']} do Apify: {result}")
+            else:
+                self.runs_aborted += 1
+
+    async def _iter_dataset_pages(self, dataset_id: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Lê o dataset em páginas por offset/limit, várias ao mesmo tempo.
+
+        A primeira página informa o total; as seguintes são baixadas em uma
+        janela de até `dataset_page_concurrency` requisições e entregues em ordem,
+        então só essa janela de páginas fica em memória.
+        """
+        dataset: DatasetClient = self._client.dataset(dataset_id)
+        page_size = self._dataset_page_size
+
+        first_page = await dataset.list_items(offset=0, limit=page_size)
+        yield first_page.items
+
+        offsets = iter(range(page_size, first_page.total, page_size))
+        pending_pages = deque()
+
+        def schedule_next_page():
+            offset = next(offsets, None)
+            if offset is not None:
+                pending_pages.append(
+                    asyncio.create_task(dataset.list_items(offset=offset, limit=page_size))
+                )
+
+        for _ in range(self._dataset_page_concurrency):
+            schedule_next_page()
+
+        try:
+            while pending_pages:
+                page = await pending_pages.popleft()
+                schedule_next_page()
+                yield page.items
+        finally:
+            for task in pending_pages:
+                task.cancel()
+
+    async def _fetch_instagram_data_batch(
+        self,
+        account_names: List[str],
         results_type: str,
-        results_limit: int = DEFAULT_RESULTS_LIMIT
-    ) -> List[Dict[str, Any]]:
-        profile_url = self._build_profile_url(account_name)
-        run_input = self._build_run_input(profile_url, results_type, results_limit)
-        
+        results_limit: int = DEFAULT_RESULTS_LIMIT,
+        item_mapper: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_deduplicated: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, List[Any]]:
+        """Busca vários perfis em uma única execução do actor.
+
+        `results_limit` vale por perfil. Contas presentes no cache não entram na
+        execução. Os itens são lidos página a página e, se `item_mapper` for
+        informado, convertidos assim que chegam, sem montar a lista bruta do
+        dataset. Retorna os itens agrupados pelo nome de conta recebido; contas
+        sem resultado aparecem com lista vazia.
+
+        As buscas passam por um single-flight: se o mesmo perfil (pelo handle
+        normalizado) já está sendo buscado por outra chamada, esta espera e
+        reaproveita o resultado em vez de disparar outra execução. Cada conta
+        atendida assim, ou repetida na própria chamada, é informada a
+        `on_deduplicated`.
+        """
+        map_item = item_mapper or (lambda item: item)
+
+        names_by_handle: Dict[str, List[str]] = {}
+        for account_name in account_names:
+            handle = self._handle_from_url(self._build_profile_url(account_name))
+            names_by_handle.setdefault(handle, []).append(account_name)
+
+        items_by_handle: Dict[str, List[Any]] = {}
+        joined: Dict[str, asyncio.Future] = {}
+        led: Dict[str, str] = {}
+        led_futures: Dict[tuple, asyncio.Future] = {}
+        loop = asyncio.get_event_loop()
+        for handle, names in names_by_handle.items():
+            for account_name in names[1:]:
+                self._record_deduplicated(account_name, on_deduplicated)
+
+            cached_items = self._get_cached(handle, results_type, results_limit)
+            if cached_items is not None:
+                items_by_handle[handle] = [map_item(item) for item in cached_items]
+                continue
+
+            key = self._in_flight_key(handle, results_type, results_limit, item_mapper)
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                joined[handle] = in_flight
+                self._record_deduplicated(names[0], on_deduplicated)
+            else:
+                # Registrado antes do primeiro await, para que chamadas
+                # concorrentes já encontrem a busca em andamento.
+                led[handle] = names[0]
+                led_futures[key] = self._in_flight[key] = loop.create_future()
+
         try:
-            actor_client: ActorClient = self._client.actor(self._actor_id)
-            run_result = await actor_client.call(run_input=run_input)
-            
-            if 'defaultDatasetId' not in run_result:
-                raise RuntimeError(
-                    f"Resposta do Apify não contém 'defaultDatasetId'. "
-                    f"Resposta: {run_result}"
-                )
-            
-            dataset_id = run_result['defaultDatasetId']
-            dataset: DatasetClient = self._client.dataset(dataset_id)
+            fetched, joined_items = await asyncio.gather(
+                self._fetch_led_handles(led, led_futures, results_type, results_limit, item_mapper),
+                self._wait_joined_handles(joined)
+            )
+        except asyncio.CancelledError:
+            # Se a busca foi cancelada antes de começar, quem se juntou a ela não pode ficar esperando.
+            self._settle_in_flight(led_futures, error=RuntimeError(f"Busca das contas {list(led.values())} cancelada"))
+            raise
+        items_by_handle.update(fetched)
+        items_by_handle.update(joined_items)
 
-            items: List[Dict[str, Any]] = []
+        return {
+            account_name: items_by_handle[handle]
+            for handle, names in names_by_handle.items()
+            for account_name in names
+        }
 
-            async for item in dataset.iterate_items():
-                items.append(item)
+    def _in_flight_key(self, handle: str, results_type: str, results_limit: int, item_mapper) -> tuple:
+        # O mapper entra na chave porque o resultado compartilhado já vem mapeado.
+        return (handle, results_type, results_limit, item_mapper)
 
-            return items
-            
-        except Exception as e:
-            raise RuntimeError(
-                f"Erro ao buscar dados do Instagram para a conta '{account_name}': {str(e)}"
-            ) from e
+    def _record_deduplicated(self, account_name: str, on_deduplicated: Optional[Callable[[str], None]]):
+        self.deduplicated_fetches += 1
+        if on_deduplicated is not None:
+            on_deduplicated(account_name)
+
+    async def _wait_joined_handles(self, joined: Dict[str, asyncio.Future]) -> Dict[str, List[Any]]:
+        if not joined:
+            return {}
+        # shield: cancelar quem espera não pode cancelar a busca de quem lidera.
+        results = await asyncio.gather(*[asyncio.shield(future) for future in joined.values()])
+        return dict(zip(joined, results))
+
+    async def _fetch_led_handles(
+        self,
+        accounts_by_handle: Dict[str, str],
+        futures: Dict[tuple, asyncio.Future],
+        results_type: str,
+        results_limit: int,
+        item_mapper: Optional[Callable[[Dict[str, Any]], Any]]
+    ) -> Dict[str, List[Any]]:
+        """Executa o actor para os perfis que esta chamada lidera e publica o resultado em `futures`."""
+        if not accounts_by_handle:
+            return {}
+
+        map_item = item_mapper or (lambda item: item)
+
+        profile_urls = [self._build_profile_url(handle) for handle in accounts_by_handle]
+        run_input = self._build_run_input(profile_urls, results_type, results_limit)
+
+        fetched_items: Dict[str, List[Any]] = {handle: [] for handle in accounts_by_handle}
+        # Os itens brutos vão para o cache já codificados, conforme chegam;
+        # a lista bruta do dataset nunca é montada.
+        cache_writers: Optional[Dict[str, CacheEntryWriter]] = None
+        if self.cache is not None:
+            cache_writers = {handle: self.cache.entry_writer() for handle in accounts_by_handle}
+
+        try:
+            dataset_id = await self._run_actor(run_input)
+            async for page in self._iter_dataset_pages(dataset_id):
+                for item in page:
+                    handle = self._item_handle(item)
+                    if handle not in fetched_items:
+                        continue
+                    fetched_items[handle].append(map_item(item))
+                    if cache_writers is not None:
+                        cache_writers[handle].append(item)
+        except BaseException as e:
+            error = RuntimeError(
+                f"Erro ao buscar dados do Instagram para as contas {list(accounts_by_handle.values())}: {str(e)}"
+            )
+            self._settle_in_flight(futures, error=error)
+            if isinstance(e, Exception):
+                raise error from e
+            raise
+
+        self._settle_in_flight(futures, results=fetched_items)
+
+        if cache_writers is not None:
+            for handle in accounts_by_handle:
+                self._set_cached(handle, results_type, results_limit, cache_writers[handle])
+
+        return fetched_items
+
+    def _settle_in_flight(
+        self,
+        futures: Dict[tuple, asyncio.Future],
+        results: Optional[Dict[str, List[Any]]] = None,
+        error: Optional[BaseException] = None
+    ):
+        for key, future in futures.items():
+            self._in_flight.pop(key, None)
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+                # Evita o aviso de exceção não lida quando ninguém se juntou à busca.
+                future.exception()
+            else:
+                future.set_result(results[key[0]])
+
+    def _get_cached(
+        self,
+        handle: str,
+        results_type: str,
+        results_limit: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache.build_key(handle, results_type, results_limit))
+
+    def _set_cached(
+        self,
+        handle: str,
+        results_type: str,
+        results_limit: int,
+        writer: CacheEntryWriter
+    ):
+        # Resultado vazio pode ser falha momentânea do scraping, então não é guardado.
+        if self.cache is None or writer.item_count == 0 or writer.oversized:
+            return
+        self.cache.set_payload(self.cache.build_key(handle, results_type, results_limit), writer.close())
+
+    async def _fetch_instagram_data(
+        self,
+        account_name: str,
+        results_type: str,
+        results_limit: int = DEFAULT_RESULTS_LIMIT
+    ) -> List[Dict[str, Any]]:
+        items_by_account = await self._fetch_instagram_data_batch(
+            [account_name],
+            results_type,
+            results_limit
+        )
+        return items_by_account[account_name]
     
     async def get_instagram_account_posts_and_comments(
         self, 
@@ -117,4 +613,49 @@ class InstagramApiFy:
             results_limit
         )
 
-instagram_apify = InstagramApiFy()
\ No newline at end of file
+    async def get_instagram_accounts_posts_and_comments(
+        self,
+        account_names: List[str],
+        results_limit: int = DEFAULT_RESULTS_LIMIT,
+        item_mapper: Optional[Callable[[Post], Any]] = None,
+        on_deduplicated: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, List[Any]]:
+        return await self._fetch_instagram_data_batch(
+            account_names,
+            RESULTS_TYPE_POSTS,
+            results_limit,
+            item_mapper,
+            on_deduplicated
+        )
+
+    async def get_instagram_accounts_details(
+        self,
+        account_names: List[str],
+        results_limit: int = DEFAULT_RESULTS_LIMIT,
+        item_mapper: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        on_deduplicated: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, List[Any]]:
+        return await self._fetch_instagram_data_batch(
+            account_names,
+            RESULTS_TYPE_DETAILS,
+            results_limit,
+            item_mapper,
+            on_deduplicated
+        )
+
+instagram_apify = InstagramApiFy(
+    concurrency=AdaptiveConcurrencyLimiter(
+        initial_limit=CoreEnv().apify_initial_concurrent_runs,
+        min_limit=CoreEnv().apify_min_concurrent_runs,
+        max_limit=CoreEnv().apify_max_concurrent_runs
+    ),
+    max_retries=CoreEnv().apify_max_retries,
+    cache=_create_scrape_cache(),
+    run_mode=CoreEnv().apify_run_mode,
+    max_in_flight_runs=CoreEnv().apify_max_in_flight_runs,
+    run_deadline_seconds=CoreEnv().apify_run_deadline_seconds,
+    hedging=RunHedgingPolicy(
+        budget_ratio=CoreEnv().apify_hedge_budget_ratio,
+        percentile=CoreEnv().apify_hedge_percentile
+    )
+)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from apify_client import ApifyClientAsync
+
+TERMINAL_RUN_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+DEFAULT_POLL_INTERVAL_SECONDS = 5.0
+DEFAULT_MAX_IN_FLIGHT_RUNS = 100
+RUNS_LIST_PAGE_SIZE = 1000
+
+class ApifyRunPoller:
+  """Acompanha várias execuções do actor com um único loop de polling.
+
+  A cada intervalo uma listagem das execuções recentes do actor atualiza o
+  status de todas as execuções pendentes de uma vez; apenas as que não
+  aparecem na listagem são consultadas individualmente. Quem chama `wait`
+  fica aguardando um Future, sem manter requisição aberta por execução.
+
+  `slot` limita as execuções em andamento a `max_in_flight` (a cota de
+  execuções simultâneas da conta): a vaga é ocupada antes do start e
+  liberada quando a execução termina.
+  """
+
+  def __init__(
+    self,
+    client: ApifyClientAsync,
+    actor_id: str,
+    poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT_RUNS
+  ):
+    self._client = client
+    self._actor_id = actor_id
+    self._poll_interval = poll_interval
+    self.max_in_flight = max_in_flight
+    self._capacity = asyncio.Semaphore(max_in_flight)
+    self._pending: Dict[str, asyncio.Future] = {}
+    self._loop_task: Optional[asyncio.Task] = None
+
+  @property
+  def in_flight(self) -> int:
+    return len(self._pending)
+
+  @asynccontextmanager
+  async def slot(self):
+    async with self._capacity:
+      yield
+
+  async def wait(self, run: Dict[str, Any]) -> Dict[str, Any]:
+    """Aguarda a execução terminar e retorna seus dados finais."""
+    if run.get("status") in TERMINAL_RUN_STATUSES:
+      return run
+
+    future = asyncio.get_running_loop().create_future()
+    self._pending[run["id"]] = future
+
+    if self._loop_task is None or self._loop_task.done():
+      self._loop_task = asyncio.create_task(self._poll_loop())
+
+    try:
+      return await future
+    finally:
+      self._pending.pop(run["id"], None)
+
+  async def _poll_loop(self):
+    while self._pending:
+      await asyncio.sleep(self._poll_interval)
+      try:
+        await self._poll_once()
+      except Exception as e:
+        print(f"Erro ao consultar execuções do Apify: {e}")
+
+  async def _poll_once(self):
+    page = await self._client.actor(self._actor_id).runs().list(
+      limit=RUNS_LIST_PAGE_SIZE,
+      desc=True
+    )
+    runs_by_id = {run["id"]: run for run in page.items}
+
+    missing_ids = [run_id for run_id in self._pending if run_id not in runs_by_id]
+    if missing_ids:
+      missing_runs = await asyncio.gather(
+        *[self._client.run(run_id).get() for run_id in missing_ids]
+      )
+      runs_by_id.update({run["id"]: run for run in missing_runs if run})
+
+    for run_id, future in list(self._pending.items()):
+      run = runs_by_id.get(run_id)
+      if run is None or future.done():
+        continue
+      if run.get("status") in TERMINAL_RUN_STATUSES:
+        future.set_result(run)
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Iterable, List, Optional
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+
+@dataclass
+class BatchJob:
+  """Job de processamento de um CSV de contas"""
+  id: str
+  filename: Optional[str]
+  file_path: str
+  status: str
+  created_at: float
+  updated_at: float
+  accounts_read: int = 0
+  accounts_uploaded: int = 0
+  accounts_failed: int = 0
+  accounts_skipped: int = 0
+  accounts_deduplicated: int = 0
+  batches_saved: int = 0
+  error: Optional[str] = None
+
+  def to_dict(self) -> dict:
+    return asdict(self)
+
+class JobStore:
+  """Persistência dos jobs em SQLite, para que sobrevivam a reinícios do processo.
+
+  Além do estado de cada job guarda as contas já enviadas, usadas para pular
+  o que já foi feito quando um job interrompido é retomado.
+  """
+
+  def __init__(self, path: str):
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+
+    self._connection = sqlite3.connect(path, isolation_level=None)
+    self._connection.row_factory = sqlite3.Row
+    self._connection.execute("PRAGMA journal_mode=WAL")
+    self._connection.execute(
+      """
+      CREATE TABLE IF NOT EXISTS batch_jobs (
+        id TEXT PRIMARY KEY,
+        filename TEXT,
+        file_path TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        accounts_read INTEGER NOT NULL DEFAULT 0,
+        accounts_uploaded INTEGER NOT NULL DEFAULT 0,
+        accounts_failed INTEGER NOT NULL DEFAULT 0,
+        batches_saved INTEGER NOT NULL DEFAULT 0,
+        error TEXT
+      )
+      """
+    )
+    self._connection.execute(
+      """
+      CREATE TABLE IF NOT EXISTS batch_job_uploaded_accounts (
+        job_id TEXT NOT NULL,
+        account TEXT NOT NULL,
+        PRIMARY KEY (job_id, account)
+      ) WITHOUT ROWID
+      """
+    )
+    self._ensure_column("batch_jobs", "accounts_skipped", "INTEGER NOT NULL DEFAULT 0")
+    self._ensure_column("batch_jobs", "accounts_deduplicated", "INTEGER NOT NULL DEFAULT 0")
+
+  def _ensure_column(self, table: str, column: str, definition: str):
+    """Adiciona a coluna em bancos criados por versões anteriores."""
+    columns = {row["name"] for row in self._connection.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+      self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+  def create(self, filename: Optional[str], file_path: str, job_id: Optional[str] = None) -> BatchJob:
+    now = time.time()
+    job = BatchJob(
+      id=job_id or uuid.uuid4().hex,
+      filename=filename,
+      file_path=file_path,
+      status=JOB_STATUS_QUEUED,
+      created_at=now,
+      updated_at=now
+    )
+    self._connection.execute(
+      "INSERT INTO batch_jobs (id, filename, file_path, status, created_at, updated_at) "
+      "VALUES (?, ?, ?, ?, ?, ?)",
+      (job.id, job.filename, job.file_path, job.status, job.created_at, job.updated_at)
+    )
+    return job
+
+  def get(self, job_id: str) -> Optional[BatchJob]:
+    row = self._connection.execute("SELECT * FROM batch_jobs WHERE id = ?", (job_id,)).fetchone()
+    return BatchJob(**dict(row)) if row else None
+
+  def list_jobs(self, statuses: Optional[Iterable[str]] = None, limit: int = 100) -> List[BatchJob]:
+    query = "SELECT * FROM batch_jobs"
+    params: list = []
+    if statuses:
+      statuses = list(statuses)
+      query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+      params.extend(statuses)
+    query += " ORDER BY created_at LIMIT ?"
+    params.append(limit)
+    return [BatchJob(**dict(row)) for row in self._connection.execute(query, params)]
+
+  def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+    self._connection.execute(
+      "UPDATE batch_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+      (status, error, time.time(), job_id)
+    )
+
+  def save_progress(self, job_id: str, accounts_read: int, accounts_failed: int, accounts_deduplicated: int = 0):
+    self._connection.execute(
+      "UPDATE batch_jobs SET accounts_read = ?, accounts_failed = ?, accounts_deduplicated = ?, "
+      "updated_at = ? WHERE id = ?",
+      (accounts_read, accounts_failed, accounts_deduplicated, time.time(), job_id)
+    )
+
+  def mark_uploaded(self, job_id: str, account_names: List[str]):
+    with self._connection:
+      self._connection.execute("BEGIN")
+      inserted = 0
+      for account_name in account_names:
+        inserted += self._connection.execute(
+          "INSERT OR IGNORE INTO batch_job_uploaded_accounts (job_id, account) VALUES (?, ?)",
+          (job_id, account_name)
+        ).rowcount
+      self._connection.execute(
+        "UPDATE batch_jobs SET accounts_uploaded = accounts_uploaded + ?, "
+        "batches_saved = batches_saved + 1, updated_at = ? WHERE id = ?",
+        (inserted, time.time(), job_id)
+      )
+
+  def mark_skipped(self, job_id: str, account_names: List[str]):
+    """Registra contas puladas como concluídas, para não serem refeitas ao retomar o job."""
+    with self._connection:
+      self._connection.execute("BEGIN")
+      inserted = 0
+      for account_name in account_names:
+        inserted += self._connection.execute(
+          "INSERT OR IGNORE INTO batch_job_uploaded_accounts (job_id, account) VALUES (?, ?)",
+          (job_id, account_name)
+        ).rowcount
+      self._connection.execute(
+        "UPDATE batch_jobs SET accounts_skipped = accounts_skipped + ?, updated_at = ? WHERE id = ?",
+        (inserted, time.time(), job_id)
+      )
+
+  def is_uploaded(self, job_id: str, account_name: str) -> bool:
+    row = self._connection.execute(
+      "SELECT 1 FROM batch_job_uploaded_accounts WHERE job_id = ? AND account = ?",
+      (job_id, account_name)
+    ).fetchone()
+    return row is not None
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+@dataclass
+class AccountWatermark:
+  """Até onde uma conta já foi carregada: post mais novo visto e último snapshot"""
+  account: str
+  newest_post_at: Optional[float]
+  newest_post_short_code: Optional[str]
+  last_snapshot_at: float
+
+class WatermarkStore:
+  """Marca d'água por conta em SQLite, usada no scraping incremental.
+
+  `advance` nunca faz a marca voltar: o post mais novo e o último snapshot só
+  são substituídos por valores mais recentes.
+  """
+
+  def __init__(self, path: str):
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+
+    self._connection = sqlite3.connect(path, isolation_level=None)
+    self._connection.row_factory = sqlite3.Row
+    self._connection.execute("PRAGMA journal_mode=WAL")
+    self._connection.execute("PRAGMA synchronous=NORMAL")
+    self._connection.execute(
+      """
+      CREATE TABLE IF NOT EXISTS account_watermarks (
+        account TEXT PRIMARY KEY,
+        newest_post_at REAL,
+        newest_post_short_code TEXT,
+        last_snapshot_at REAL NOT NULL
+      ) WITHOUT ROWID
+      """
+    )
+
+  def get_many(self, account_names: List[str]) -> Dict[str, AccountWatermark]:
+    if not account_names:
+      return {}
+
+    rows = self._connection.execute(
+      f"SELECT * FROM account_watermarks WHERE account IN ({', '.join('?' for _ in account_names)})",
+      account_names
+    )
+    return {row["account"]: AccountWatermark(**dict(row)) for row in rows}
+
+  def advance(self, watermarks: List[AccountWatermark]):
+    with self._connection:
+      self._connection.execute("BEGIN")
+      self._connection.executemany(
+        """
+        INSERT INTO account_watermarks (account, newest_post_at, newest_post_short_code, last_snapshot_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (account) DO UPDATE SET
+          newest_post_short_code = CASE
+            WHEN excluded.newest_post_at > COALESCE(newest_post_at, -1) THEN excluded.newest_post_short_code
+            ELSE newest_post_short_code
+          END,
+          newest_post_at = NULLIF(MAX(COALESCE(newest_post_at, -1), COALESCE(excluded.newest_post_at, -1)), -1),
+          last_snapshot_at = MAX(last_snapshot_at, excluded.last_snapshot_at)
+        """,
+        [
+          (watermark.account, watermark.newest_post_at, watermark.newest_post_short_code, watermark.last_snapshot_at)
+          for watermark in watermarks
+        ]
+      )
@@ -0,0 +1,23 @@
+from typing import List, TypedDict
+
+from core.utils.serialize import safe_get
+from ..services.instagram_service import instagram_service, ACCOUNTS_TO_SCRAPE_TOPIC
+
+class _AccountsToScrapeRetry(TypedDict, total=False):
+  # Quantas vezes as contas já foram tentadas; ausente na primeira entrega.
+  attempt: int
+
+class AccountsToScrapeMessage(_AccountsToScrapeRetry):
+  accounts: List[str]
+
+class AccountsToScrapeTopic:
+  """Faz o scraping dos grupos de contas distribuídos pelo processor_batch."""
+
+  name = ACCOUNTS_TO_SCRAPE_TOPIC
+
+  async def execute(self, message: AccountsToScrapeMessage):
+    account_names = safe_get(message, "accounts") or []
+    if not account_names:
+      return
+
+    await instagram_service.scrape_accounts_group(account_names, safe_get(message, "attempt") or 0)
@@ -0,0 +1,24 @@
+from core.env import CoreEnv
+from core.messaging.kafka.consumer import retrive_data_topic_loop
+from .accounts_to_scrape import AccountsToScrapeTopic
+import asyncio
+
+SCRAPER_GROUP_ID = 'processor_batch_scraper'
+
+class Consumer:
+  topics = [
+    AccountsToScrapeTopic()
+  ]
+
+  async def consume(self):
+    # Vários consumidores no mesmo grupo dividem as partições; cada um processa
+    # um grupo de contas por vez, então eles dão a concorrência do processo.
+    consumers = CoreEnv().scraper_worker_consumers
+    await asyncio.gather(*[
+      retrive_data_topic_loop([topic.name], topic.execute, group_id=SCRAPER_GROUP_ID)
+      for topic in self.topics
+      for _ in range(consumers)
+    ])
+    print("All topics consumed")
+
+consumer = Consumer()
@@ -0,0 +1,28 @@
+import io
+
+import pytest
+
+from core.utils import json_codec
+from core.utils.ndjson import FORMAT_NDJSON_GZIP, iter_ndjson_records, write_ndjson_files
+
+RECORDS = [
+    {"shortCode": "A1", "caption": "primeira linha\u2028segunda linha"},
+    {"shortCode": "B2", "caption": "parágrafo\u2029outro\u0085fim"},
+    {"shortCode": "C3", "caption": "sem separador"},
+]
+
+def _round_trip(records):
+    files = list(write_ndjson_files(records, lambda record: record, FORMAT_NDJSON_GZIP, 1024 * 1024, 100))
+    assert len(files) == 1
+
+    content, written = files[0]
+    assert written == records
+    return list(iter_ndjson_records(io.BytesIO(content), FORMAT_NDJSON_GZIP))
+
+@pytest.mark.parametrize("codec_name", json_codec.available_codecs())
+def test_ndjson_gzip_round_trip_keeps_unicode_line_separators(monkeypatch, codec_name):
+    codec = json_codec.create_json_codec(codec_name)
+    monkeypatch.setattr(json_codec, "dumps", codec.dumps)
+    monkeypatch.setattr(json_codec, "loads", codec.loads)
+
+    assert _round_trip(RECORDS) == RECORDS
@@ -0,0 +1,58 @@
+-- Troca os date_sk aleatórios (uuid) pela chave determinística YYYYMMDD e
+-- reduz dim_date a uma linha por dia.
+--
+-- Rode com o load_raw_data parado: linhas ainda no streaming buffer (inseridas
+-- há menos de ~30 min) não podem ser alteradas por UPDATE/DELETE.
+
+BEGIN TRANSACTION;
+
+CREATE TEMP TABLE date_sk_map AS
+SELECT date_sk AS old_date_sk, FORMAT_DATE('%Y%m%d', date) AS new_date_sk
+FROM instagram_data.dim_date
+WHERE date_sk != FORMAT_DATE('%Y%m%d', date);
+
+UPDATE instagram_data.dim_instagram_post t
+SET date_sk = m.new_date_sk
+FROM date_sk_map m
+WHERE t.date_sk = m.old_date_sk;
+
+UPDATE instagram_data.fact_instagram_post_metrics t
+SET date_sk = m.new_date_sk
+FROM date_sk_map m
+WHERE t.date_sk = m.old_date_sk;
+
+UPDATE instagram_data.dim_instagram_comment t
+SET date_sk = m.new_date_sk
+FROM date_sk_map m
+WHERE t.date_sk = m.old_date_sk;
+
+UPDATE instagram_data.fact_instagram_comment_metrics t
+SET date_sk = m.new_date_sk
+FROM date_sk_map m
+WHERE t.date_sk = m.old_date_sk;
+
+-- Posts sem timestamp (e seus comentários) apontavam para um uuid sem linha em
+-- dim_date; passam a usar a chave de data desconhecida.
+UPDATE instagram_data.dim_instagram_post SET date_sk = '00000000' WHERE NOT REGEXP_CONTAINS(date_sk, r'^\d{8}$');
+UPDATE instagram_data.fact_instagram_post_metrics SET date_sk = '00000000' WHERE NOT REGEXP_CONTAINS(date_sk, r'^\d{8}$');
+UPDATE instagram_data.dim_instagram_comment SET date_sk = '00000000' WHERE NOT REGEXP_CONTAINS(date_sk, r'^\d{8}$');
+UPDATE instagram_data.fact_instagram_comment_metrics SET date_sk = '00000000' WHERE NOT REGEXP_CONTAINS(date_sk, r'^\d{8}$');
+
+CREATE TEMP TABLE dim_date_dedup AS
+SELECT DISTINCT date
+FROM instagram_data.dim_date;
+
+DELETE FROM instagram_data.dim_date WHERE TRUE;
+
+INSERT INTO instagram_data.dim_date (date_sk, date, day, month, year, weekday, is_weekend)
+SELECT
+  FORMAT_DATE('%Y%m%d', date),
+  date,
+  EXTRACT(DAY FROM date),
+  EXTRACT(MONTH FROM date),
+  EXTRACT(YEAR FROM date),
+  FORMAT_DATE('%A', date),
+  EXTRACT(DAYOFWEEK FROM date) IN (1, 7)
+FROM dim_date_dedup;
+
+COMMIT TRANSACTION;
@@ -0,0 +1,18 @@
+-- Pré-carrega o calendário em dim_date, uma linha por dia com chave YYYYMMDD.
+-- O intervalo deve ser o mesmo de DIM_DATE_CALENDAR_START/DIM_DATE_CALENDAR_END
+-- (core/env.py): datas dentro dele não são mais gravadas pelo ETL. Pode ser
+-- rodada de novo para estender o intervalo, só insere os dias que faltam.
+
+INSERT INTO instagram_data.dim_date (date_sk, date, day, month, year, weekday, is_weekend)
+SELECT
+  FORMAT_DATE('%Y%m%d', day_date),
+  day_date,
+  EXTRACT(DAY FROM day_date),
+  EXTRACT(MONTH FROM day_date),
+  EXTRACT(YEAR FROM day_date),
+  FORMAT_DATE('%A', day_date),
+  EXTRACT(DAYOFWEEK FROM day_date) IN (1, 7)
+FROM UNNEST(GENERATE_DATE_ARRAY('2010-01-01', '2035-12-31')) AS day_date
+WHERE FORMAT_DATE('%Y%m%d', day_date) NOT IN (
+  SELECT date_sk FROM instagram_data.dim_date
+);
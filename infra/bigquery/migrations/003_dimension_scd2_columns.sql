@@ -0,0 +1,22 @@
+-- Colunas de versão usadas pelo modo merge_scd2 (BIGQUERY_TABLE_SINK_MODES) nas
+-- dimensões. No modo merge_scd1 e nos demais elas ficam nulas.
+
+ALTER TABLE instagram_data.dim_instagram_account
+  ADD COLUMN IF NOT EXISTS valid_from TIMESTAMP,
+  ADD COLUMN IF NOT EXISTS valid_to TIMESTAMP,
+  ADD COLUMN IF NOT EXISTS is_current BOOL;
+
+ALTER TABLE instagram_data.dim_instagram_post
+  ADD COLUMN IF NOT EXISTS valid_from TIMESTAMP,
+  ADD COLUMN IF NOT EXISTS valid_to TIMESTAMP,
+  ADD COLUMN IF NOT EXISTS is_current BOOL;
+
+ALTER TABLE instagram_data.dim_instagram_comment
+  ADD COLUMN IF NOT EXISTS valid_from TIMESTAMP,
+  ADD COLUMN IF NOT EXISTS valid_to TIMESTAMP,
+  ADD COLUMN IF NOT EXISTS is_current BOOL;
+
+-- Antes de ligar o merge_scd2 em uma dimensão, marque as linhas existentes
+-- como versão atual, para que o MERGE as encerre quando a entidade mudar:
+--
+-- UPDATE instagram_data.dim_instagram_account SET is_current = TRUE WHERE is_current IS NULL;